@@ -0,0 +1,161 @@
+"""
+`Args.match`的参数绑定开销
+
+用法:
+    python benchmarks/bench_args.py
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import fake  # noqa: E402
+from harness import Result, ameasure, isolated_helper  # noqa: E402
+from nonebot.consts import CMD_ARG_KEY, PREFIX_KEY  # noqa: E402
+
+from nonebot_args_patch import (  # noqa: E402
+    AtRequire,
+    Default,
+    Require,
+    Rest,
+    SegmentRequire,
+)
+from nonebot_args_patch.commandarg import Args  # noqa: E402
+
+
+def get_user(event: fake.Event) -> str:
+    return event.get_user_id()
+
+
+BINDING_CASES = (
+    (
+        {"day": Default("今天"), "city": Default("上海")},
+        {
+            "": ("今天", "上海"),
+            "明天": ("明天", "上海"),
+            "明天 北京": ("明天", "北京"),
+        },
+    ),
+    (
+        {"day": Default("今天", priority=2), "city": Default("上海")},
+        {
+            "": ("今天", "上海"),
+            "北京": ("今天", "北京"),
+            "明天 北京": ("明天", "北京"),
+        },
+    ),
+    (
+        {"q": Require(), "day": Default("今天"), "city": Default("上海")},
+        {
+            "a": ("a", "今天", "上海"),
+            "a b": ("a", "b", "上海"),
+            "a b c": ("a", "b", "c"),
+        },
+    ),
+)
+"""参数 -> 命令参数文本 -> 各参数的值"""
+
+
+def check_default_binding(bot: fake.Bot) -> None:
+    """
+    说明:
+        检查`Default`的参数绑定，优先级相同的`Default`按声明顺序获取参数，不丢弃参数
+
+    异常:
+        * `AssertionError`：绑定结果不一致
+    """
+    with isolated_helper():
+        for i, (kwargs, expected) in enumerate(BINDING_CASES):
+            args = Args.new({f"绑定{i}"}, True, **kwargs)
+            for text, values in expected.items():
+                arg_msg = fake.Message(text)
+                matcher = fake.Matcher({PREFIX_KEY: {CMD_ARG_KEY: arg_msg}})
+                result = asyncio.run(
+                    args.match(bot=bot, event=fake.make_event(arg_msg), matcher=matcher)
+                )
+                actual = tuple(result[name] for name in kwargs)
+                assert actual == values, (list(kwargs), text, actual, values)
+
+
+def collect() -> List[Result]:
+    bot = fake.init()
+    check_default_binding(bot)
+    MessageSegment = fake.MessageSegment
+    cases = (
+        (
+            "args.require_2",
+            {"a": Require(), "b": Require()},
+            fake.Message("北京 明天"),
+        ),
+        (
+            "args.require_default_static",
+            {"a": Require(), "b": Default("x"), "c": Default("y", priority=2)},
+            fake.Message("北京 明天"),
+        ),
+        (
+            "args.default_callable",
+            {"a": Require(), "b": Default(lambda: "x"), "c": Default(get_user)},
+            fake.Message("北京"),
+        ),
+        (
+            "args.at_require",
+            {"who": AtRequire(), "reason": Require()},
+            fake.Message([MessageSegment.at("123"), MessageSegment.text(" 刷屏")]),
+        ),
+        (
+            "args.segment_require",
+            {"who": AtRequire(), "pic": SegmentRequire("image"), "reason": Require()},
+            fake.Message(
+                [
+                    MessageSegment.at("123"),
+                    MessageSegment.text(" 刷屏 "),
+                    MessageSegment.image("a.jpg"),
+                ]
+            ),
+        ),
+        (
+            "args.too_many",
+            {"a": Require(), "b": Require()},
+            fake.Message("a b " * 2000),
+        ),
+        (
+            "args.rest_500",
+            {"reason": Require(), "ids": Rest(type_=int)},
+            fake.Message("刷屏 " + " ".join(str(i) for i in range(10000, 10500))),
+        ),
+    )
+    results = []
+    with isolated_helper():
+        for name, kwargs, arg_msg in cases:
+            args = Args.new({name}, True, **kwargs)
+            event = fake.make_event(arg_msg)
+            matcher = fake.Matcher({PREFIX_KEY: {CMD_ARG_KEY: arg_msg}})
+
+            async def _match(args=args, event=event, matcher=matcher) -> None:
+                try:
+                    await args.match(bot=bot, event=event, matcher=matcher)
+                except Exception:
+                    pass
+
+            results.append(ameasure(name, _match, 5000, args=len(kwargs)))
+
+        # 最后一个用例的Rest参数在遍历时才分词和转换
+        async def _iterate(args=args, event=event, matcher=matcher) -> None:
+            result = await args.match(bot=bot, event=event, matcher=matcher)
+            for _ in result["ids"]:
+                pass
+
+        results.append(ameasure("args.rest_500_iterate", _iterate, 200, args=2))
+    return results
+
+
+def main() -> None:
+    for result in collect():
+        print(f"{result['name']:<30} {result['median_us']:8.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+同一命令大量交错调用时的参数隔离与内存占用，结果不一致或内存增长时报错
+
+用法:
+    python benchmarks/bench_concurrency.py
+"""
+
+import asyncio
+import gc
+import sys
+import tracemalloc
+from pathlib import Path
+from typing import List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import fake  # noqa: E402
+from harness import Result, ameasure, isolated_helper  # noqa: E402
+from nonebot.consts import CMD_ARG_KEY, PREFIX_KEY  # noqa: E402
+
+from nonebot_args_patch import Default, Require  # noqa: E402
+from nonebot_args_patch.commandarg import Args  # noqa: E402
+from nonebot_args_patch.result import ArgsResult  # noqa: E402
+
+NUM = 3000
+"""每轮同时进行的调用数"""
+ROUNDS = 10
+"""检查内存的轮数"""
+WARMUP = 2
+"""预热轮数，之后每轮都不应增加常驻内存"""
+MAX_GROWTH = 16 * 1024
+"""预热后允许的常驻内存增长（字节），每次调用泄漏1字节也会超过"""
+
+
+async def get_user(event: fake.Event) -> str:
+    """让出事件循环的默认值函数，使不同调用的参数解析和默认值获取交错进行"""
+    await asyncio.sleep(0)
+    return event.get_user_id()
+
+
+def make_calls(num: int) -> List[Tuple[fake.Event, fake.Matcher, str, str]]:
+    """构造num次调用，每次调用的参数和用户都不同"""
+    calls = []
+    for i in range(num):
+        city = f"城市{i}"
+        user_id = str(100000 + i)
+        message = fake.Message(f"{city} {i % 7}")
+        event = fake.make_event(message, user_id=user_id)
+        matcher = fake.Matcher({PREFIX_KEY: {CMD_ARG_KEY: message}})
+        calls.append((event, matcher, city, user_id))
+    return calls
+
+
+async def run_round(
+    bot: fake.Bot, args: Args, calls: List[Tuple[fake.Event, fake.Matcher, str, str]]
+) -> None:
+    """
+    说明:
+        同时进行所有调用，检查每次调用得到的都是自己的参数
+
+    异常:
+        * `AssertionError`：出现串扰
+    """
+    results = await asyncio.gather(
+        *(
+            args.match(bot=bot, event=event, matcher=matcher)
+            for event, matcher, *_ in calls
+        )
+    )
+    ids = set()
+    for (_, _, city, user_id), result in zip(calls, results):
+        assert isinstance(result, ArgsResult)
+        assert result["city"] == city, (result, city)
+        assert result["user"] == user_id, (result, user_id)
+        assert result["days"] == int(city[2:]) % 7, (result, city)
+        ids.add(id(result))
+    assert len(ids) == len(calls), "不同调用得到了同一个结果对象"
+
+
+def collect() -> List[Result]:
+    bot = fake.init()
+    with isolated_helper():
+        args = Args.new(
+            {"天气"},
+            True,
+            city=Require(),
+            days=Default(0, type_=int),
+            user=Default(get_user),
+        )
+        attrs = dict(vars(args))
+        calls = make_calls(NUM)
+
+        async def _round() -> None:
+            await run_round(bot, args, calls)
+
+        async def _memory() -> List[int]:
+            memory = []
+            tracemalloc.start()
+            try:
+                for _ in range(ROUNDS):
+                    await run_round(bot, args, calls)
+                    gc.collect()
+                    memory.append(tracemalloc.get_traced_memory()[0])
+            finally:
+                tracemalloc.stop()
+            return memory
+
+        result = ameasure("concurrency.interleaved", _round, 1, 3, calls=NUM)
+        result["best_us"] /= NUM
+        result["median_us"] /= NUM
+        memory = asyncio.run(_memory())
+        growth = max(memory[WARMUP:]) - memory[WARMUP - 1]
+        assert growth < MAX_GROWTH, f"预热后常驻内存增长了{growth}字节"
+        assert dict(vars(args)) == attrs, "调用修改了命令的Args类"
+
+    result["retained_bytes"] = growth
+    return [result]
+
+
+def main() -> None:
+    for result in collect():
+        print(
+            f"{result['name']:<30} {result['median_us']:8.2f} us/call"
+            f" retained={result['retained_bytes']}B over {ROUNDS - WARMUP} rounds"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+nb2处理一条消息的开销随命令数量的变化，对比逐个检查命令matcher与分发matcher
+
+用法:
+    python benchmarks/bench_dispatch.py
+"""
+
+import asyncio
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Iterator, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import fake  # noqa: E402
+from harness import Result, ameasure, isolated_matchers  # noqa: E402
+from nonebot.adapters import Event  # noqa: E402
+from nonebot.message import handle_event  # noqa: E402
+
+from nonebot_args_patch import config, on_command  # noqa: E402
+from nonebot_args_patch import patch  # noqa: E402, F401
+from nonebot_args_patch.args import Default, Require  # noqa: E402
+from nonebot_args_patch.helper import CommandHelper  # noqa: E402
+
+SIZES = (10, 100, 1000)
+"""命令数量"""
+
+
+@contextmanager
+def dispatch_mode(enabled: bool) -> Iterator[None]:
+    """临时切换`args_patch_dispatch`配置"""
+    saved = config._config
+    config._config = config.get_config().copy(update={"args_patch_dispatch": enabled})
+    try:
+        yield
+    finally:
+        config._config = saved
+
+
+class RecordBot(fake.Bot):
+    """记录发送的消息"""
+
+    sent: List[Any]
+    """发送的消息"""
+
+    async def send(self, event: Event, message: Any, **kwargs: Any) -> Any:
+        self.sent.append(message)
+
+
+def check_arg_error_help(bot: fake.Bot) -> None:
+    """
+    说明:
+        `temp`、`expire_time`的命令参数错误时，仍然回复命令自身的提示
+
+    异常:
+        * `AssertionError`：没有回复提示，或未过期命令的提示被移除
+    """
+    bot = RecordBot(bot.adapter, bot.self_id)
+    for enabled in (False, True):
+        with dispatch_mode(enabled), isolated_matchers():
+            on_command("一次", temp=True, x=Require())
+            on_command(
+                "限时", expire_time=datetime.now() + timedelta(hours=1), x=Require()
+            )
+            for name in ("一次", "限时"):
+                bot.sent = []
+                # 每种模式使用不同的用户，避免提示被限流
+                event = fake.make_event(f"/{name}", user_id=f"2000{enabled:d}")
+                asyncio.run(handle_event(bot, event))
+                assert bot.sent == [f"出错，命令传入参数不足：\n{name} x"], (
+                    name,
+                    enabled,
+                    bot.sent,
+                )
+            # temp命令运行后已失效，限时命令未过期，提示应保留
+            assert "限时" in CommandHelper.command_dict, enabled
+
+
+def collect() -> List[Result]:
+    bot = fake.init()
+    check_arg_error_help(bot)
+    results = []
+    for size in SIZES:
+        names = fake.make_names(size, seed=2)
+        events = {
+            "command": fake.make_event(f"/{names[size // 2]} 1"),
+            "chatter": fake.make_event(fake.CHATTER[1]),
+        }
+        for enabled in (False, True):
+            with dispatch_mode(enabled), isolated_matchers():
+                for name in names:
+                    matcher = on_command(name, target=Require(), times=Default(1))
+                    matcher.append_handler(lambda: None)
+                for kind, event in events.items():
+
+                    async def _handle(event=event) -> None:
+                        await handle_event(bot, event)
+
+                    results.append(
+                        ameasure(
+                            f"dispatch.{kind}",
+                            _handle,
+                            max(5, 2000 // size),
+                            commands=size,
+                            dispatch=enabled,
+                        )
+                    )
+    results.extend(collect_rule_check(bot))
+    return results
+
+
+def collect_rule_check(bot: fake.Bot) -> List[Result]:
+    """参数数量不对的消息，在规则中检查与在simple_run中检查"""
+    results = []
+    names = fake.make_names(SIZES[0], seed=2)
+    event = fake.make_event(f"/{names[0]} 1 2 3")
+    for rule_check in (False, True):
+        with isolated_matchers():
+            for name in names:
+                matcher = on_command(
+                    name, rule_check=rule_check, target=Require(), times=Default(1)
+                )
+                matcher.append_handler(lambda: None)
+
+            async def _handle() -> None:
+                await handle_event(bot, event)
+
+            results.append(
+                ameasure(
+                    "dispatch.too_many_args",
+                    _handle,
+                    200,
+                    commands=SIZES[0],
+                    rule_check=rule_check,
+                )
+            )
+    return results
+
+
+def main() -> None:
+    for result in collect():
+        params = result["params"]
+        mode = ",".join(f"{k}={v}" for k, v in params.items() if k != "commands")
+        name = f"{result['name']}[{params['commands']},{mode}]"
+        print(f"{name:<40} {result['median_us']:10.2f} us/msg")
+
+
+if __name__ == "__main__":
+    main()
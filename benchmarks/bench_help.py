@@ -0,0 +1,88 @@
+"""
+帮助matcher在普通聊天消息上的开销
+
+用法:
+    python benchmarks/bench_help.py
+"""
+
+import shlex
+import sys
+from difflib import get_close_matches
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import fake  # noqa: E402
+from harness import Result, ameasure, isolated_helper, measure  # noqa: E402
+from nonebot.exception import FinishedException  # noqa: E402
+
+from nonebot_args_patch.helper import (  # noqa: E402
+    CommandHelp,
+    CommandHelper,
+    OneArgHelp,
+)
+from nonebot_args_patch.patch import help_handle  # noqa: E402
+
+
+def make_commands(num: int) -> None:
+    """注册num条随机命令"""
+    for name in fake.make_names(num):
+        CommandHelper.add_command(
+            names={name},
+            command=CommandHelp(
+                command={name},
+                need_help=True,
+                args_help=[OneArgHelp(name="arg", optional=False)],
+            ),
+        )
+
+
+def legacy_help(text: str) -> None:
+    """旧版help_handle：每条消息都完整分词，再用difflib逐个比较全部命令"""
+    args_list = shlex.split(text)
+    if args_list:
+        get_close_matches(args_list[0], CommandHelper.command_dict.keys())
+
+
+def collect() -> List[Result]:
+    bot = fake.init()
+    results = []
+    with isolated_helper():
+        make_commands(800)
+        messages = [fake.Message(text) for text in fake.CHATTER]
+        events = [fake.make_event(msg) for msg in messages]
+        matcher = fake.Matcher()
+
+        def _legacy() -> None:
+            for msg in messages:
+                legacy_help(msg.extract_plain_text())
+
+        async def _help_handle() -> None:
+            for event in events:
+                try:
+                    await help_handle(matcher, bot, event)
+                except FinishedException:
+                    pass
+
+        n = len(messages)
+        for result in (
+            measure("help.legacy_chatter", _legacy, 50, commands=800, messages=n),
+            ameasure(
+                "help.help_handle_chatter", _help_handle, 50, commands=800, messages=n
+            ),
+        ):
+            # 换算为每条消息
+            result["best_us"] /= n
+            result["median_us"] /= n
+            results.append(result)
+    return results
+
+
+def main() -> None:
+    for result in collect():
+        print(f"{result['name']:<28} {result['median_us']:8.2f} us/msg")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+补丁日志在高频调用时的开销
+
+用法:
+    python benchmarks/bench_log.py
+"""
+
+import os
+import sys
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import fake  # noqa: E402
+from harness import Result, measure  # noqa: E402
+from nonebot.log import default_format, logger  # noqa: E402
+
+from nonebot_args_patch.config import Config  # noqa: E402
+from nonebot_args_patch.log import LogPolicy  # noqa: E402
+
+
+def collect() -> List[Result]:
+    bot = fake.init()
+    event = fake.make_event("/天气 北京 明天 多余的参数")
+    state = {"_prefix": {"command": ("天气",), "raw_command": "/天气"}}
+    policy = LogPolicy(Config(), "INFO")
+    msg = "命令传入参数过多"
+
+    def _legacy_trace() -> None:
+        logger.trace(
+            f"Matcher run with incoming args: "
+            f"bot={bot}, event={event!r}, state={state!r}"
+        )
+
+    def _trace() -> None:
+        if policy.trace:
+            logger.trace(
+                "{} run with incoming args: bot={}, event={!r}, state={!r}",
+                "Matcher",
+                bot,
+                event,
+                state,
+            )
+
+    def _legacy_arg_error() -> None:
+        logger.error(msg)
+
+    def _arg_error() -> None:
+        policy.arg_error("天气", event, msg)
+
+    # 模拟输出到文件的日志处理器，不受nb2日志等级影响
+    devnull = open(os.devnull, "w", encoding="utf-8")
+    handler_id = logger.add(devnull, level="INFO", format=default_format)
+    try:
+        return [
+            measure("log.legacy_trace", _legacy_trace, 2000),
+            measure("log.trace", _trace, 2000),
+            measure("log.legacy_arg_error_spam", _legacy_arg_error, 2000),
+            measure("log.arg_error_spam", _arg_error, 2000),
+        ]
+    finally:
+        logger.remove(handler_id)
+        devnull.close()
+
+
+def main() -> None:
+    for result in collect():
+        print(f"{result['name']:<28} {result['median_us']:8.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+导入补丁前后，没有使用本模块的nb2 matcher的运行开销
+
+同一个普通matcher分别在两个子进程中测量，一个不导入补丁，一个导入`nonebot_args_patch.patch`，
+导入补丁的进程会先确认nb2的`Matcher.simple_run`没有被替换
+
+用法:
+    python benchmarks/bench_matcher.py
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import List
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+
+import fake  # noqa: E402
+from harness import Result, ameasure  # noqa: E402
+from nonebot.matcher import Matcher  # noqa: E402
+
+WORKER = "--worker"
+"""子进程参数"""
+RUNS = 3
+"""每种情况的子进程数，两种情况交替运行，取中位数最小的一次，减少机器负载波动的影响"""
+
+
+async def handler() -> None:
+    pass
+
+
+def measure_plain(patched: bool) -> Result:
+    """
+    说明:
+        在当前进程中测量普通matcher，`patched`为`True`时先导入补丁
+
+    异常:
+        * `AssertionError`：导入补丁后nb2的`Matcher.simple_run`被替换
+    """
+    bot = fake.init()
+    simple_run = Matcher.__dict__["simple_run"]
+    if patched:
+        from nonebot_args_patch import patch  # noqa: F401
+
+        assert Matcher.__dict__["simple_run"] is simple_run, "补丁替换了nb2的simple_run"
+    event = fake.make_event("哈哈哈哈")
+    plain = Matcher.new("message", handlers=[handler])
+
+    async def _run() -> None:
+        await plain().run(bot, event, {})
+
+    return ameasure("matcher.plain", _run, 5000, patched=patched)
+
+
+def collect() -> List[Result]:
+    best = {}
+    for _ in range(RUNS):
+        for patched in (False, True):
+            args = [sys.executable, __file__, WORKER]
+            if patched:
+                args.append("--patched")
+            output = subprocess.run(
+                args, check=True, capture_output=True, text=True, cwd=HERE
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            if patched not in best or result["median_us"] < best[patched]["median_us"]:
+                best[patched] = result
+    return [best[False], best[True]]
+
+
+def main() -> None:
+    if WORKER in sys.argv:
+        print(json.dumps(measure_plain("--patched" in sys.argv)))
+        return
+    for result in collect():
+        print(
+            f"{result['name']:<16} patched={result['params']['patched']!s:<5}"
+            f" {result['median_us']:8.2f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+命令注册的耗时与命令帮助占用的内存
+
+用法:
+    python benchmarks/bench_register.py
+"""
+
+import sys
+import tracemalloc
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import fake  # noqa: E402
+from harness import (  # noqa: E402
+    Result,
+    isolated_helper,
+    isolated_matchers,
+    measure,
+)
+
+from nonebot_args_patch import (  # noqa: E402
+    CommandGroup,
+    Default,
+    DefaultCache,
+    Require,
+)
+from nonebot_args_patch.helper import (  # noqa: E402
+    CommandHelp,
+    CommandHelper,
+    OneArgHelp,
+)
+
+NUM = 5000
+"""注册的命令数"""
+STARTUP_NUM = 1000
+"""启动耗时测试注册的命令数"""
+
+
+def make_help(name: str) -> CommandHelp:
+    """与Args.new相同的方式构造一条命令帮助"""
+    return CommandHelp(
+        command={name},
+        need_help=True,
+        args_help=[
+            OneArgHelp(name="参数", optional=False),
+            OneArgHelp(name="次数", optional=True),
+        ],
+        name=name,
+    )
+
+
+def get_user_city(event: fake.Event) -> str:
+    """多个命令共用的默认值函数"""
+    return event.get_user_id()
+
+
+def collect() -> List[Result]:
+    fake.init()
+    names = fake.make_names(NUM)
+    cache = DefaultCache(ttl=60)
+    results = []
+
+    def _register() -> None:
+        with isolated_helper():
+            for name in names:
+                CommandHelper.add_command({name}, make_help(name))
+
+    result = measure("register.help_records", _register, 1, commands=NUM)
+    result["best_us"] /= NUM
+    result["median_us"] /= NUM
+    results.append(result)
+
+    def _build() -> None:
+        for name in names:
+            make_help(name)
+
+    result = measure("register.build_help", _build, 1, commands=NUM)
+    result["best_us"] /= NUM
+    result["median_us"] /= NUM
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    helps = [make_help(name) for name in names]
+    result["bytes_per_command"] = (tracemalloc.get_traced_memory()[0] - before) / NUM
+    tracemalloc.stop()
+    results.append(result)
+
+    def _help_msg() -> None:
+        for help in helps:
+            help.get_help_msg()
+
+    result = measure("register.get_help_msg", _help_msg, 1, commands=NUM)
+    result["best_us"] /= NUM
+    result["median_us"] /= NUM
+    results.append(result)
+
+    def _default() -> None:
+        for _ in names:
+            Default(get_user_city, cache=cache)
+
+    result = measure("register.default_callable", _default, 1, commands=NUM)
+    result["best_us"] /= NUM
+    result["median_us"] /= NUM
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    defaults = [Default(get_user_city, cache=cache) for _ in names]  # noqa: F841
+    result["bytes_per_command"] = (tracemalloc.get_traced_memory()[0] - before) / NUM
+    tracemalloc.stop()
+    results.append(result)
+
+    results.extend(collect_startup())
+    return results
+
+
+def collect_startup() -> List[Result]:
+    """用CommandGroup逐条注册和批量注册的启动耗时"""
+    fake.init()
+    names = fake.make_names(STARTUP_NUM, seed=1)
+    results = []
+    for need_space in (False, True):
+        group = CommandGroup(need_space=need_space)
+
+        def _register() -> None:
+            with isolated_matchers():
+                for name in names:
+                    group.on_command(name, target=Require(), times=Default(1))
+
+        def _batch() -> None:
+            with isolated_matchers():
+                with group.batch():
+                    for name in names:
+                        group.on_command(name, target=Require(), times=Default(1))
+
+        for name, func in (
+            ("register.on_command", _register),
+            ("register.batch", _batch),
+        ):
+            result = measure(
+                name, func, 1, 3, commands=STARTUP_NUM, need_space=need_space
+            )
+            result["best_us"] /= STARTUP_NUM
+            result["median_us"] /= STARTUP_NUM
+            results.append(result)
+    return results
+
+
+def main() -> None:
+    for result in collect():
+        name = result["name"]
+        if "need_space" in result["params"]:
+            name += f"[need_space={result['params']['need_space']}]"
+        line = f"{name:<40} {result['median_us']:8.2f} us/cmd"
+        if "bytes_per_command" in result:
+            line += f" {result['bytes_per_command']:8.0f} B/cmd"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+`SpaceCommandRule.__call__`的开销
+
+用法:
+    python benchmarks/bench_rule.py
+"""
+
+import sys
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import fake  # noqa: E402
+from harness import Result, ameasure  # noqa: E402
+
+from nonebot_args_patch.rule import (  # noqa: E402
+    BareCommandIndex,
+    SpaceCommandRule,
+    get_bare_texts,
+)
+
+
+def collect() -> List[Result]:
+    fake.init()
+    rule = SpaceCommandRule(False, [("test",)])
+    default_rule = SpaceCommandRule(True, [("test",)])
+    BareCommandIndex.add(get_bare_texts([("test",)]))
+    command_event = fake.make_event("test 1 2")
+    chatter_event = fake.make_event("今天天气不错啊，我们出去玩吧")
+    bare_event = fake.make_event("test")
+
+    cases = (
+        ("rule.command_hit", rule, command_event, ("test",)),
+        ("rule.command_miss", rule, chatter_event, None),
+        ("rule.all_default_miss", default_rule, chatter_event, None),
+        ("rule.all_default_bare_hit", default_rule, bare_event, None),
+    )
+    results = []
+    for name, checker, event, cmd in cases:
+
+        async def _call(checker=checker, event=event, cmd=cmd) -> None:
+            await checker(event, {}, cmd)
+
+        results.append(ameasure(name, _call, 20000))
+
+    # 同一条消息依次经过多个全Default命令的规则，与nb2逐个检查matcher时一致
+    names = fake.make_names(100)
+    default_rules = [SpaceCommandRule(True, [(name,)]) for name in names]
+    BareCommandIndex.add(get_bare_texts([(name,) for name in names]))
+    for name, text in (
+        ("rule.all_default_x100_miss", fake.CHATTER[1]),
+        ("rule.all_default_x100_hit", f"/{names[50]}"),
+    ):
+        # 每轮使用新的事件，避免复用上一轮的查找结果
+        events = [fake.make_event(text) for _ in range(200)]
+
+        async def _check_all(events=events) -> None:
+            for event in events:
+                for checker in default_rules:
+                    await checker(event, {}, None)
+
+        result = ameasure(name, _check_all, 1, rules=len(default_rules))
+        result["best_us"] /= len(events)
+        result["median_us"] /= len(events)
+        results.append(result)
+    return results
+
+
+def main() -> None:
+    for result in collect():
+        print(f"{result['name']:<28} {result['median_us']:8.2f} us/msg")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+`CommandHelper.get_similar_commands`随命令数量的变化，计时前先与`difflib.get_close_matches`对比结果
+
+用法:
+    python benchmarks/bench_similar.py
+"""
+
+import random
+import sys
+from difflib import get_close_matches
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import fake  # noqa: E402
+from bench_help import make_commands  # noqa: E402
+from harness import Result, isolated_helper, measure  # noqa: E402
+
+from nonebot_args_patch.helper import (  # noqa: E402
+    CommandHelp,
+    CommandHelper,
+    OneArgHelp,
+)
+from nonebot_args_patch.index import SimilarIndex  # noqa: E402
+
+SIZES = (10, 100, 1000, 5000, 20000, 50000)
+"""命令数量"""
+SCOPES = 10
+"""分区测试的提示范围数量"""
+CHECK_COMMANDS = 800
+"""与difflib对比的命令数量"""
+CHECK_QUERIES = 7000
+"""与difflib对比的查询数量"""
+
+
+def make_queries(names: List[str]) -> List[str]:
+    """从命令中生成拼写错误的查询，再混入聊天内容"""
+    queries = []
+    for name in names[:: max(1, len(names) // 20)][:20]:
+        queries.append(name[1:] + name[0])
+    return queries + fake.CHATTER
+
+
+def make_typos(names: List[str], num: int, seed: int = 1) -> List[str]:
+    """生成num条拼写错误的查询：轮转、删字、替换、乱序各占约四分之一"""
+    rand = random.Random(seed)
+    chars = fake.WORDS + "abcdefghijklmnopqrstuvwxyz"
+    queries = []
+    for _ in range(num):
+        name = rand.choice(names)
+        kind = rand.randrange(4)
+        if kind == 0:
+            query = name[1:] + name[0]
+        elif kind == 1:
+            query = name[:-1]
+        elif kind == 2:
+            pos = rand.randrange(len(name))
+            query = name[:pos] + rand.choice(chars) + name[pos + 1 :]
+        else:
+            query = "".join(rand.sample(name, len(name)))
+        queries.append(query)
+    return queries
+
+
+def check_difflib() -> int:
+    """
+    说明:
+        对比`SimilarIndex.search`与`difflib.get_close_matches`的首个结果
+
+    返回:
+        * `int`：对比的查询数量
+
+    异常:
+        * `AssertionError`：结果不一致
+    """
+    names = fake.make_names(CHECK_COMMANDS, seed=2)
+    index = SimilarIndex()
+    for name in names:
+        index.add(name)
+    queries = make_typos(names, CHECK_QUERIES) + fake.CHATTER
+    for query in queries:
+        expect = get_close_matches(query, names, 1)
+        result = index.search(query)
+        assert result == (expect[0] if expect else None), (query, expect, result)
+    return len(queries)
+
+
+def collect() -> List[Result]:
+    # 先确认结果与difflib一致，再计时
+    check_difflib()
+    results = []
+    for size in SIZES:
+        with isolated_helper():
+            make_commands(size)
+            queries = make_queries(fake.make_names(size))
+
+            def _search(queries=queries) -> None:
+                for query in queries:
+                    CommandHelper.get_similar_commands(query)
+
+            result = measure("similar.get_similar_commands", _search, 20, commands=size)
+            result["best_us"] /= len(queries)
+            result["median_us"] /= len(queries)
+            results.append(result)
+    results.extend(collect_scoped())
+    return results
+
+
+def collect_scoped() -> List[Result]:
+    """5000条命令平均分到多个提示范围，只查找一个范围与查找全部范围"""
+    size = 5000
+    names = fake.make_names(size)
+    queries = make_queries(names)
+    results = []
+    with isolated_helper():
+        for i, name in enumerate(names):
+            CommandHelper.add_command(
+                names={name},
+                command=CommandHelp(
+                    command={name},
+                    need_help=True,
+                    args_help=[OneArgHelp(name="arg", optional=False)],
+                    scope=i % SCOPES,
+                ),
+            )
+        for name, scopes in (
+            ("similar.all_scopes", None),
+            ("similar.one_scope", (0,)),
+        ):
+
+            def _search(scopes=scopes) -> None:
+                for query in queries:
+                    CommandHelper.get_similar_commands(query, scopes)
+
+            result = measure(name, _search, 20, commands=size, scopes=SCOPES)
+            result["best_us"] /= len(queries)
+            result["median_us"] /= len(queries)
+            results.append(result)
+    return results
+
+
+def main() -> None:
+    for result in collect():
+        print(
+            f"{result['name']} commands={result['params']['commands']:<6}"
+            f" {result['median_us']:8.2f} us/query"
+        )
+
+
+if __name__ == "__main__":
+    main()
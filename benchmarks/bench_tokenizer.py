@@ -0,0 +1,59 @@
+"""
+内置分词器与`shlex.split`的对比
+
+用法:
+    python benchmarks/bench_tokenizer.py
+"""
+
+import shlex
+import sys
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from harness import Result, measure  # noqa: E402
+
+from nonebot_args_patch.tokenizer import split  # noqa: E402
+
+INPUTS = [
+    "北京",
+    "北京 明天",
+    "123456789 987654321",
+    "add 10 20 30",
+    '"new york" tomorrow',
+    "set nickname '小 明'",
+    "搜图 https://example.com/a.png?x=1&y=2",
+    "这是一条比较长的聊天消息，后面跟着几个参数 a b c d e f g",
+    'say "hello \\"world\\"" to everyone',
+]
+"""聊天长度的参数文本"""
+
+
+def collect() -> List[Result]:
+    for text in INPUTS:
+        assert split(text) == shlex.split(text), text
+
+    def _run(func):
+        def _inner() -> None:
+            for text in INPUTS:
+                func(text)
+
+        return _inner
+
+    results = []
+    for name, func in (("tokenizer.shlex", shlex.split), ("tokenizer.split", split)):
+        result = measure(name, _run(func), 2000, inputs=len(INPUTS))
+        result["best_us"] /= len(INPUTS)
+        result["median_us"] /= len(INPUTS)
+        results.append(result)
+    return results
+
+
+def main() -> None:
+    for result in collect():
+        print(f"{result['name']:<20} {result['median_us']:8.2f} us/text")
+
+
+if __name__ == "__main__":
+    main()
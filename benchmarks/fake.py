@@ -0,0 +1,167 @@
+"""
+benchmark使用的替身对象，不依赖任何adapter和网络
+"""
+
+import random
+from typing import Any, Iterable, List, Type
+
+import nonebot
+from nonebot.adapters import Adapter as BaseAdapter
+from nonebot.adapters import Bot as BaseBot
+from nonebot.adapters import Event as BaseEvent
+from nonebot.adapters import Message as BaseMessage
+from nonebot.adapters import MessageSegment as BaseMessageSegment
+from nonebot.exception import FinishedException
+from nonebot.typing import T_State
+
+
+class MessageSegment(BaseMessageSegment["Message"]):
+    @classmethod
+    def get_message_class(cls) -> Type["Message"]:
+        return Message
+
+    def __str__(self) -> str:
+        return self.data["text"] if self.is_text() else f"[{self.type}]"
+
+    def is_text(self) -> bool:
+        return self.type == "text"
+
+    @classmethod
+    def text(cls, text: str) -> "MessageSegment":
+        return cls("text", {"text": text})
+
+    @classmethod
+    def at(cls, user_id: str) -> "MessageSegment":
+        return cls("at", {"qq": user_id})
+
+    @classmethod
+    def image(cls, file: str) -> "MessageSegment":
+        return cls("image", {"file": file})
+
+
+class Message(BaseMessage[MessageSegment]):
+    @classmethod
+    def get_segment_class(cls) -> Type[MessageSegment]:
+        return MessageSegment
+
+    @staticmethod
+    def _construct(msg: str) -> Iterable[MessageSegment]:
+        yield MessageSegment.text(msg)
+
+
+class Event(BaseEvent):
+    message: Message
+    user_id: str = "10000"
+    group_id: str = "20000"
+
+    def get_type(self) -> str:
+        return "message"
+
+    def get_event_name(self) -> str:
+        return "message.group"
+
+    def get_event_description(self) -> str:
+        return str(self.message)
+
+    def get_user_id(self) -> str:
+        return self.user_id
+
+    def get_session_id(self) -> str:
+        return f"group_{self.group_id}_{self.user_id}"
+
+    def get_message(self) -> Message:
+        return self.message
+
+    def is_tome(self) -> bool:
+        return False
+
+
+class Adapter(BaseAdapter):
+    @classmethod
+    def get_name(cls) -> str:
+        return "fake"
+
+    async def _call_api(self, bot: BaseBot, api: str, **data: Any) -> Any:
+        return None
+
+
+class Bot(BaseBot):
+    async def send(self, event: BaseEvent, message: Any, **kwargs: Any) -> Any:
+        return None
+
+
+class Matcher:
+    """只实现help_handle和Args.match用到的接口"""
+
+    def __init__(self, state: T_State = None) -> None:
+        self.state = state or {}
+
+    def stop_propagation(self) -> None:
+        pass
+
+    async def finish(self, message: Any = None, **kwargs: Any) -> None:
+        raise FinishedException
+
+
+def init() -> Bot:
+    """初始化nb2，返回替身bot"""
+    try:
+        driver = nonebot.get_driver()
+    except ValueError:
+        nonebot.init(command_start={"/", ""}, command_sep={"."}, log_level="CRITICAL")
+        driver = nonebot.get_driver()
+    return Bot(Adapter(driver), "10001")
+
+
+def make_event(message: Any, user_id: str = "10000", group_id: str = "20000") -> Event:
+    """构造消息事件"""
+    if not isinstance(message, Message):
+        message = Message(message)
+    return Event(message=message, user_id=user_id, group_id=group_id)
+
+
+WORDS = (
+    "天气查询帮助签到抽卡绑定解绑设置查看列表排行运势骰子点歌搜图翻译订阅取消开启关闭"
+)
+"""生成中文命令使用的字"""
+
+
+def make_names(num: int, seed: int = 0) -> List[str]:
+    """生成num个不重复的随机命令名，中英文各半"""
+    rand = random.Random(seed)
+    names = set()
+    while len(names) < num:
+        if rand.random() < 0.5:
+            name = "".join(rand.choice(WORDS) for _ in range(rand.randint(2, 4)))
+        else:
+            name = "".join(
+                rand.choice("abcdefghijklmnopqrstuvwxyz")
+                for _ in range(rand.randint(3, 8))
+            )
+        names.add(name)
+    return sorted(names)
+
+
+CHATTER = [
+    "哈哈哈哈",
+    "今天天气不错啊，我们出去玩吧",
+    "有人在吗",
+    "+1",
+    "草",
+    "晚上吃什么",
+    "这个视频太好笑了 https://example.com/v/123",
+    "ok",
+    "我觉得还行吧，就是有点贵",
+    "？？？",
+    "早上好",
+    "lol",
+    "明天几点集合",
+    "收到",
+    "哈哈哈哈",
+    "我也是",
+    "草",
+    "谢谢大佬",
+    "666",
+    "啊这",
+]
+"""群聊中常见的非命令消息"""
@@ -0,0 +1,134 @@
+"""
+benchmark计时工具
+"""
+
+import asyncio
+import gc
+import statistics
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, List
+
+from nonebot.matcher import matchers
+from nonebot.rule import TrieRule
+from pygtrie import CharTrie
+
+from nonebot_args_patch.dispatch import Dispatcher
+from nonebot_args_patch.helper import CommandHelper
+from nonebot_args_patch.rule import BareCommandIndex
+
+Result = Dict[str, Any]
+"""一条benchmark结果"""
+
+
+def _result(
+    name: str, number: int, times: List[float], params: Dict[str, Any]
+) -> Result:
+    per_op = [t / number * 1e6 for t in times]
+    return {
+        "name": name,
+        "params": params,
+        "number": number,
+        "repeat": len(times),
+        "best_us": min(per_op),
+        "median_us": statistics.median(per_op),
+    }
+
+
+def measure(
+    name: str,
+    func: Callable[[], Any],
+    number: int,
+    repeat: int = 5,
+    **params: Any,
+) -> Result:
+    """
+    说明:
+        测量同步函数，每轮调用`number`次，共`repeat`轮
+
+    返回:
+        * `Result`：单次调用耗时（微秒）的最优值与中位数
+    """
+    times = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            times.append(time.perf_counter() - start)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return _result(name, number, times, params)
+
+
+def ameasure(
+    name: str,
+    func: Callable[[], Awaitable[Any]],
+    number: int,
+    repeat: int = 5,
+    **params: Any,
+) -> Result:
+    """测量异步函数，参数与`measure`一致"""
+
+    async def _run() -> List[float]:
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                await func()
+            times.append(time.perf_counter() - start)
+        return times
+
+    return _result(name, number, asyncio.run(_run()), params)
+
+
+@contextmanager
+def isolated_helper() -> Iterator[None]:
+    """在独立的命令帮助表中运行，结束后恢复"""
+    saved = (
+        CommandHelper.command_dict,
+        CommandHelper.indexes,
+        CommandHelper.scopes,
+        CommandHelper.miss_cache,
+        CommandHelper.owners,
+    )
+    CommandHelper.command_dict = {}
+    CommandHelper.indexes = {}
+    CommandHelper.scopes = {}
+    CommandHelper.miss_cache = type(saved[3])()
+    CommandHelper.owners = {}
+    try:
+        yield
+    finally:
+        (
+            CommandHelper.command_dict,
+            CommandHelper.indexes,
+            CommandHelper.scopes,
+            CommandHelper.miss_cache,
+            CommandHelper.owners,
+        ) = saved
+
+
+@contextmanager
+def isolated_matchers() -> Iterator[None]:
+    """在独立的命令帮助表、事件响应器表、分发表和命令前缀中运行，结束后恢复"""
+    saved_matchers = dict(matchers)
+    saved_prefix = TrieRule.prefix
+    saved_dispatch = (Dispatcher.rules, Dispatcher.dispatchers)
+    saved_bare = BareCommandIndex.texts
+    matchers.clear()
+    TrieRule.prefix = CharTrie()
+    Dispatcher.rules, Dispatcher.dispatchers = {}, {}
+    BareCommandIndex.texts = {}
+    try:
+        with isolated_helper():
+            yield
+    finally:
+        matchers.clear()
+        matchers.update(saved_matchers)
+        TrieRule.prefix = saved_prefix
+        Dispatcher.rules, Dispatcher.dispatchers = saved_dispatch
+        BareCommandIndex.texts = saved_bare
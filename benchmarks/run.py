@@ -0,0 +1,94 @@
+"""
+运行全部benchmark，输出JSON结果，便于在不同提交之间对比
+
+用法:
+    python benchmarks/run.py -o result.json
+    python benchmarks/run.py -o new.json --compare old.json
+    python benchmarks/run.py -k args -k rule
+"""
+
+import argparse
+import importlib
+import json
+import platform
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE))
+sys.path.insert(0, str(HERE.parent))
+
+from harness import Result  # noqa: E402
+
+
+def get_commit() -> Optional[str]:
+    """当前git提交"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=HERE, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def key(result: Result) -> str:
+    """结果的唯一标识"""
+    params = ",".join(f"{k}={v}" for k, v in sorted(result["params"].items()))
+    return f"{result['name']}[{params}]"
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any]) -> None:
+    """打印两次结果的中位数变化"""
+    old_results = {key(result): result for result in old["results"]}
+    print(f"\n{'benchmark':<56} {'old':>10} {'new':>10} {'change':>8}")
+    for result in new["results"]:
+        name = key(result)
+        if name not in old_results:
+            continue
+        before = old_results[name]["median_us"]
+        after = result["median_us"]
+        print(f"{name:<56} {before:10.2f} {after:10.2f} {after / before - 1:+8.1%}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-o", "--output", help="结果JSON文件，默认输出到标准输出")
+    parser.add_argument("--compare", help="与之对比的结果JSON文件")
+    parser.add_argument(
+        "-k",
+        dest="filters",
+        action="append",
+        default=[],
+        help="只运行名称包含该字符串的模块",
+    )
+    args = parser.parse_args()
+
+    modules = sorted(path.stem for path in HERE.glob("bench_*.py"))
+    if args.filters:
+        modules = [name for name in modules if any(f in name for f in args.filters)]
+
+    results: List[Result] = []
+    for name in modules:
+        module = importlib.import_module(name)
+        print(f"running {name}...", file=sys.stderr)
+        results.extend(module.collect())
+
+    output = {
+        "commit": get_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    text = json.dumps(output, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+    else:
+        print(text)
+    if args.compare:
+        compare(json.loads(Path(args.compare).read_text(encoding="utf-8")), output)
+
+
+if __name__ == "__main__":
+    main()
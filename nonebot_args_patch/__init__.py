@@ -10,6 +10,11 @@ import nonebot_args_patch.patch
 from .args import AtRequire as AtRequire
 from .args import Default as Default
 from .args import Require as Require
+from .args import Rest as Rest
+from .args import SegmentRequire as SegmentRequire
+from .cache import DefaultCache as DefaultCache
 from .commandarg import CommandGroup as CommandGroup
 from .commandarg import get_args as get_args
 from .commandarg import on_command as on_command
+from .result import ArgsResult as ArgsResult
+from .result import RestArgs as RestArgs
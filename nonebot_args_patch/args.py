@@ -1,8 +1,15 @@
+import asyncio
 from typing import Any, Callable, Optional, Union
+from weakref import WeakKeyDictionary
 
+from nonebot import logger
 from nonebot.dependencies import Dependent
+from nonebot.internal.adapter import Bot, Event
+from nonebot.internal.matcher import Matcher
 from nonebot.message import RUN_PREPCS_PARAMS
 
+from .cache import DefaultCache
+
 
 class Arg:
     """参数基类"""
@@ -11,10 +18,61 @@ class Arg:
     """参数提示名"""
     optional: bool
     """是否可选"""
+    type_: Optional[Callable[[str], Any]]
+    """用户参数的类型或转换函数"""
 
-    def __init__(self, name: str, optional: bool) -> None:
+    def __init__(
+        self,
+        name: str,
+        optional: bool,
+        type_: Optional[Callable[[str], Any]] = None,
+    ) -> None:
         self.name = name
         self.optional = optional
+        self.type_ = type_
+
+
+TYPE_NAMES = {int: "整数", float: "数字", str: "文本"}
+"""常用类型的显示名"""
+
+
+def get_type_name(type_: Callable[[str], Any]) -> str:
+    """获取类型或转换函数的显示名"""
+    return TYPE_NAMES.get(type_, getattr(type_, "__name__", repr(type_)))
+
+
+SEGMENT_NAMES = {"at": "at目标", "image": "图片", "face": "表情", "record": "语音"}
+"""常用消息段类型的显示名"""
+
+
+def get_segment_name(segment_type: str) -> str:
+    """获取消息段类型的显示名"""
+    return SEGMENT_NAMES.get(segment_type, f"{segment_type}消息段")
+
+
+DEPENDENTS: "WeakKeyDictionary[Callable[..., Any], Dependent[Any]]" = (
+    WeakKeyDictionary()
+)
+"""默认值函数 -> 依赖容器，函数被回收时自动移除"""
+
+
+def get_dependent(call: Callable[..., Any]) -> Dependent[Any]:
+    """
+    说明:
+        获取默认值函数的依赖容器，同一函数只解析一次签名，所有命令共享
+
+        无法弱引用的函数（如内置函数）每次都重新解析
+    """
+    try:
+        return DEPENDENTS[call]
+    except (KeyError, TypeError):
+        pass
+    dependent = Dependent[Any].parse(call=call, allow_types=RUN_PREPCS_PARAMS)
+    try:
+        DEPENDENTS[call] = dependent
+    except TypeError:
+        pass
+    return dependent
 
 
 class Require(Arg):
@@ -24,13 +82,63 @@ class Require(Arg):
 
     参数:
         * `help`：帮助指令提示的参数显示名称
+        * `type_`：参数类型或转换函数，如`int`，在匹配参数时转换一次，转换失败时返回帮助信息
     """
 
-    def __init__(self, help: str = None) -> None:
+    def __init__(
+        self, help: str = None, type_: Optional[Callable[[str], Any]] = None
+    ) -> None:
+        super().__init__(help, False, type_)
+
+
+class Rest(Arg):
+    """
+    说明:
+        剩余的全部用户参数，必须是最后一个参数，获取到的是`RestArgs`
+
+        * 前面的参数先依次获取用户参数，剩下的都属于该参数，可以为空
+        * `RestArgs`在遍历时才分词和转换，不会生成中间列表，适合大量参数
+        * 总是使用内置分词器，与配置`args_patch_tokenizer`无关
+
+    参数:
+        * `help`：帮助指令提示的参数显示名称
+        * `type_`：每一项的类型或转换函数，遍历时转换，转换失败时抛出`CommandArgException`
+        * `max`：最多获取的项数，超出部分被截断，默认为`None`不限制
+    """
+
+    max: Optional[int]
+    """最多获取的项数"""
+
+    def __init__(
+        self,
+        help: str = None,
+        type_: Optional[Callable[[str], Any]] = None,
+        max: Optional[int] = None,
+    ) -> None:
+        self.max = max
+        super().__init__(help, True, type_)
+
+
+class SegmentRequire(Arg):
+    """
+    说明:
+        * 该参数表示需要获取一个非文本消息段，如图片，获取到的会是`MessageSegment`
+        * 与文本参数的位置无关，只看数量；同类型的`SegmentRequire`之间按消息段的顺序获取
+
+    参数:
+        * `segment_type`：消息段类型，如`image`、`face`，需要adapter支持
+        * `help`：帮助指令提示的参数显示名称
+    """
+
+    segment_type: str
+    """消息段类型"""
+
+    def __init__(self, segment_type: str, help: str = None) -> None:
+        self.segment_type = segment_type
         super().__init__(help, False)
 
 
-class AtRequire(Arg):
+class AtRequire(SegmentRequire):
     """
     说明:
         * 该参数表示需要获取机器人at的目标，获取到的会是`MessageSegment`
@@ -44,7 +152,7 @@ class AtRequire(Arg):
     """
 
     def __init__(self, help: str = None) -> None:
-        super().__init__(help, False)
+        super().__init__("at", help)
 
 
 class Default(Arg):
@@ -57,9 +165,14 @@ class Default(Arg):
             `Callable`时，可以使用依赖注入，并拥有`bot`，`matcher`，`event`，`state`等注入参数
         * `help`：帮助指令提示的参数显示名称
         * `priority`: 优先级，在缺少参数时，优先级越高的Default更优先获取参数，参数越小优先级越高，默认为1
+        * `type_`：用户提供参数时的类型或转换函数，默认值不会被转换
+        * `cache`：`default`为`Callable`时的缓存策略`DefaultCache`，默认为`None`不缓存
+        * `timeout`：`default`为`Callable`时的超时时间（秒），超时后使用`fallback`，默认为`None`不限制
+        * `fallback`：超时后使用的默认值
 
     注意:
         * 在使用`get_args`获取该参数时，类型注解需要保持一致
+        * 相同的`default`函数只解析一次签名；同一个`Default`可以在多个命令中使用，共享缓存
 
     例子:
 
@@ -79,6 +192,12 @@ class Default(Arg):
     """默认值"""
     priority: int
     """优先级"""
+    cache: Optional[DefaultCache]
+    """默认值函数的缓存策略"""
+    timeout: Optional[float]
+    """默认值函数的超时时间"""
+    fallback: Any
+    """超时后使用的默认值"""
     matched: bool
     """已完成匹配"""
 
@@ -87,15 +206,43 @@ class Default(Arg):
         default: Union[Callable[..., Any], Any],
         help: str = None,
         priority: int = 1,
+        type_: Optional[Callable[[str], Any]] = None,
+        cache: Optional[DefaultCache] = None,
+        timeout: Optional[float] = None,
+        fallback: Any = None,
     ) -> None:
         if callable(default):
             self.is_callable = True
-            self.func = Dependent[Any].parse(
-                call=default, allow_types=RUN_PREPCS_PARAMS
-            )
+            self.func = get_dependent(default)
         else:
             self.is_callable = False
             self.value = default
         self.priority = priority
+        self.cache = cache
+        self.timeout = timeout
+        self.fallback = fallback
         self.matched = False
-        super().__init__(name=help, optional=True)
+        super().__init__(name=help, optional=True, type_=type_)
+
+    async def resolve(self, bot: Bot, event: Event, matcher: Matcher) -> Any:
+        """
+        说明:
+            获取默认值，`default`为`Callable`时运行依赖注入，并使用缓存策略和超时
+        """
+        if not self.is_callable:
+            return self.value
+
+        def _call():
+            return self.func(bot=bot, event=event, matcher=matcher, state=matcher.state)
+
+        if self.cache is None:
+            coro = _call()
+        else:
+            coro = self.cache.get(bot, event, _call)
+        if self.timeout is None:
+            return await coro
+        try:
+            return await asyncio.wait_for(coro, self.timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"获取默认值超时，使用{self.fallback!r}")
+            return self.fallback
@@ -0,0 +1,150 @@
+import asyncio
+import time
+from collections import OrderedDict
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple, Union
+
+from nonebot.internal.adapter import Bot, Event
+
+T_CacheKey = Callable[[Bot, Event], Hashable]
+"""缓存键函数"""
+
+
+def user_key(bot: Bot, event: Event) -> Hashable:
+    """按用户缓存"""
+    return (bot.self_id, event.get_user_id())
+
+
+def group_key(bot: Bot, event: Event) -> Hashable:
+    """按群缓存，事件没有群号时按会话缓存"""
+    group_id = getattr(event, "group_id", None)
+    if group_id is None:
+        return (bot.self_id, "session", event.get_session_id())
+    return (bot.self_id, "group", group_id)
+
+
+def global_key(bot: Bot, event: Event) -> Hashable:
+    """全局共用一份缓存"""
+    return None
+
+
+CACHE_KEYS: Dict[str, T_CacheKey] = {
+    "user": user_key,
+    "group": group_key,
+    "global": global_key,
+}
+"""内置的缓存键"""
+
+
+class DefaultCache:
+    """
+    说明:
+        `Default`默认值函数的缓存策略
+
+        * 过期时间内相同缓存键直接返回缓存结果
+        * 超过`maxsize`时淘汰最久未使用的缓存
+        * 同一缓存键的并发未命中只会调用一次默认值函数，其余调用等待该结果
+        * 调用方超时不会中断默认值函数，完成后结果仍会写入缓存
+        * 默认值函数抛出异常时不缓存
+
+    参数:
+        * `ttl`：缓存有效时间（秒），默认为60
+        * `key`：缓存键，可以是`user`（按用户）、`group`（按群）、`global`（全局），
+            也可以是`(bot, event) -> Hashable`的函数，默认为`user`
+        * `maxsize`：最多缓存的条目数，默认为1024
+
+    例子:
+
+    ```python
+    matcher = on_command(
+        "天气",
+        city=Default(get_user_city, cache=DefaultCache(ttl=300, key="user")),
+    )
+    ```
+    """
+
+    ttl: float
+    """缓存有效时间"""
+    key: T_CacheKey
+    """缓存键函数"""
+    maxsize: int
+    """最多缓存的条目数"""
+    hits: int
+    """命中次数"""
+    misses: int
+    """未命中次数"""
+
+    def __init__(
+        self,
+        ttl: float = 60,
+        key: Union[str, T_CacheKey] = "user",
+        maxsize: int = 1024,
+    ) -> None:
+        if isinstance(key, str):
+            try:
+                key = CACHE_KEYS[key]
+            except KeyError:
+                raise ValueError(f"未知的缓存键 {key}，可选：{'、'.join(CACHE_KEYS)}")
+        self.ttl = ttl
+        self.key = key
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._pending: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        """正在获取的缓存键"""
+
+    def __repr__(self) -> str:
+        return (
+            f"DefaultCache(ttl={self.ttl}, size={len(self._data)}/{self.maxsize}, "
+            f"hits={self.hits}, misses={self.misses})"
+        )
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self) -> None:
+        """清空缓存，不影响统计"""
+        self._data.clear()
+
+    async def get(
+        self, bot: Bot, event: Event, factory: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        说明:
+            获取缓存，未命中时调用factory
+
+        参数:
+            * `bot`、`event`：用于计算缓存键
+            * `factory`：未命中时获取值的函数
+        """
+        key = self.key(bot, event)
+        data = self._data
+        if key in data:
+            expire, value = data[key]
+            if expire > time.monotonic():
+                data.move_to_end(key)
+                self.hits += 1
+                return value
+            del data[key]
+
+        task = self._pending.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(factory())
+            self._pending[key] = task
+            task.add_done_callback(partial(self._on_done, key))
+        else:
+            self.hits += 1
+        # 调用方超时或取消时，默认值函数继续运行，完成后写入缓存
+        return await asyncio.shield(task)
+
+    def _on_done(self, key: Hashable, task: "asyncio.Future[Any]") -> None:
+        del self._pending[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+        data = self._data
+        data[key] = (time.monotonic() + self.ttl, task.result())
+        data.move_to_end(key)
+        if len(data) > self.maxsize:
+            data.popitem(last=False)
@@ -1,11 +1,19 @@
-import shlex
+import asyncio
+import sys
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+from itertools import islice
+from types import ModuleType
 from typing import (
     Any,
+    Awaitable,
     Callable,
     Dict,
     Generic,
+    Hashable,
+    Iterator,
     List,
+    Mapping,
     Optional,
     Set,
     Tuple,
@@ -18,23 +26,96 @@ from nonebot import Bot, logger, on_message
 from nonebot.consts import CMD_ARG_KEY, PREFIX_KEY
 from nonebot.dependencies import Dependent
 from nonebot.internal.adapter.event import Event
-from nonebot.internal.adapter.message import Message
-from nonebot.internal.matcher import Matcher
+from nonebot.internal.adapter.message import Message, MessageSegment
+from nonebot.internal.matcher import Matcher, matchers
 from nonebot.internal.permission import Permission
 from nonebot.internal.rule import Rule
 from nonebot.params import Depends
+from nonebot.plugin import Plugin
+from nonebot.plugin.manager import _current_plugin_chain
+from nonebot.plugin.on import _store_matcher
 from nonebot.rule import command
 from nonebot.typing import T_Handler, T_PermissionChecker, T_RuleChecker, T_State
 
-from .args import Arg, AtRequire, Default, Require
+from .args import (
+    Arg,
+    Default,
+    Require,
+    Rest,
+    SegmentRequire,
+    get_segment_name,
+    get_type_name,
+)
+from .config import get_config
 from .consts import ARGS, ARGSTYPE
+from .dispatch import Dispatcher
 from .exception import CommandArgException
 from .helper import CommandHelp, CommandHelper, OneArgHelp
-from .provider import DefaultManager
-from .rule import space_command
+from .metrics import CommandMetrics, metrics
+from .provider import ArgsProvider, DefaultManager
+from .result import ArgsResult, RestArgs
+from .rule import (
+    BareCommandIndex,
+    Prefix,
+    add_prefixes,
+    check_args,
+    deferred_command,
+    space_command,
+)
+from .runner import simple_run
+from .tokenizer import iter_spans, split_args, unquote
 
 T = TypeVar("T", bound=Arg)
 
+TokenSlot = Tuple[int, int, Arg, str]
+"""使用用户参数的槽位：(结果位置, 分词下标, 参数, 参数显示名)"""
+DefaultSlot = Tuple[int, Default]
+"""使用默认值的槽位：(结果位置, 参数)"""
+BindingPlan = Tuple[Tuple[TokenSlot, ...], Tuple[DefaultSlot, ...]]
+"""一种分词数量下的绑定方式"""
+
+
+def compile_binding_plan(
+    args_list: List[Tuple[str, Arg]],
+    arg_index: Dict[str, int],
+    default_manager: DefaultManager,
+) -> List[Optional[BindingPlan]]:
+    """
+    说明:
+        预先计算每种分词数量下各参数的取值方式，下标为分词数量
+
+        * 分词数量少于必选参数数量时为`None`
+        * `Default`按`priority`依次获取用户参数，与逐次匹配时的规则一致
+
+    返回:
+        * `List[Optional[BindingPlan]]`：绑定表
+    """
+    num_args = len(args_list)
+    num_required = sum(1 for _, arg in args_list if isinstance(arg, Require))
+    plan: List[Optional[BindingPlan]] = []
+    for num_tokens in range(num_args + 1):
+        if num_tokens < num_required:
+            plan.append(None)
+            continue
+        need_default_num = num_args - num_tokens
+        default_gennerate = default_manager.get_arg()
+        # 按Default的数量而不是优先级的数量计算
+        need_get_defult_num = (
+            sum(len(args) for args in default_manager.values()) - need_default_num
+        )
+        get_default_arg = [next(default_gennerate) for _ in range(need_get_defult_num)]
+        token_slots: List[TokenSlot] = []
+        default_slots: List[DefaultSlot] = []
+        count = 0
+        for name, arg in args_list:
+            if isinstance(arg, Default) and arg not in get_default_arg:
+                default_slots.append((arg_index[name], arg))
+            else:
+                token_slots.append((arg_index[name], count, arg, arg.name or name))
+                count += 1
+        plan.append((tuple(token_slots), tuple(default_slots)))
+    return plan
+
 
 class Args(Generic[T]):
     """
@@ -47,62 +128,100 @@ class Args(Generic[T]):
     """默认参数的管理器"""
     num_args: int
     """参数数量"""
-    is_matched: bool
-    """是否匹配完成"""
-    need_at: bool
-    """是否需要获取at目标"""
-    num_at: int
-    """at目标数量"""
-    at_name_list: List[str]
-    """at的参数名列表"""
-    result: Dict[str, Any]
-    """匹配结果字典"""
+    binding_plan: List[Optional[BindingPlan]]
+    """绑定表，下标为分词数量"""
+    arg_index: Dict[str, int]
+    """参数名 -> 参数定义位置"""
+    segment_slots: Dict[str, List[int]]
+    """消息段类型 -> 该类型的`SegmentRequire`的结果位置，按定义顺序"""
+    min_args: int
+    """最少的用户参数数量"""
+    rest: Optional[Tuple[int, Rest, str]]
+    """`Rest`参数：(结果位置, 参数, 参数显示名)，没有时为`None`"""
+    max_length: Optional[int]
+    """参数文本最大长度"""
+    metrics: Optional[CommandMetrics]
+    """命令统计，关闭统计时为`None`"""
+    help: CommandHelp
+    """命令提示信息，由`on_command`加入`CommandHelper`"""
 
     @classmethod
-    def new(cls, cmd: Set[str], need_help: bool, **kwargs: T) -> Type["Args"]:
+    def new(
+        cls,
+        cmd: Set[str],
+        need_help: bool,
+        max_length: Optional[int] = None,
+        command_name: Optional[str] = None,
+        scope: Hashable = None,
+        provider_class: Optional[Type[ArgsProvider]] = None,
+        **kwargs: T,
+    ) -> Type["Args"]:
         """
         创建一个Args类
         """
+        command_name = command_name or "/".join(sorted(cmd))
         args_list: List[Tuple[str, T]] = []
-        at_name_list: List[str] = []
+        arg_index: Dict[str, int] = {}
+        segment_slots: Dict[str, List[int]] = {}
         command_help_list: List[OneArgHelp] = []
-        default_manager = DefaultManager()
-        need_at = False
+        default_manager = DefaultManager(provider_class)
+        rest = None
         for name, arg in kwargs.items():
             if not isinstance(arg, Arg):
                 raise TypeError(
-                    f"命令传入参数类型错误，{name} 的类型必须为'Require','AtRequire'或'Default'"
+                    f"命令传入参数类型错误，{name} 的类型必须为'Require','AtRequire','SegmentRequire','Default'或'Rest'"
                 )
-            command_help_list.append(
-                OneArgHelp(name=arg.name if arg.name else name, optional=arg.optional)
-            )
-            if isinstance(arg, AtRequire):
-                need_at = True
-                at_name_list.append(name)
+            if rest is not None:
+                raise TypeError(
+                    f"命令传入参数类型错误，'Rest'参数{rest[2]}必须是最后一个参数"
+                )
+            arg_index[name] = len(arg_index)
+            label = arg.name if arg.name else name
+            if isinstance(arg, Rest):
+                rest = (arg_index[name], arg, label)
+                command_help_list.append(OneArgHelp(name=f"{label}...", optional=True))
+                continue
+            command_help_list.append(OneArgHelp(name=label, optional=arg.optional))
+            if isinstance(arg, SegmentRequire):
+                segment_slots.setdefault(arg.segment_type, []).append(arg_index[name])
             else:
                 args_list.append((name, arg))
                 if isinstance(arg, Default):
-                    default_manager[arg.priority].append(arg)
-        CommandHelper.add_command(
-            names=cmd,
-            command=CommandHelp(
-                command=cmd, need_help=need_help, args_help=command_help_list
-            ),
-        )
+                    default_manager.setdefault(arg.priority, []).append(arg)
         num_args = len(args_list)
-        num_at = len(at_name_list)
+        binding_plan = compile_binding_plan(args_list, arg_index, default_manager)
+        min_args = next(
+            count for count, plan in enumerate(binding_plan) if plan is not None
+        )
         new_args = type(
             "Args",
             (Args,),
             {
                 "args_list": args_list,
                 "num_args": num_args,
+                "binding_plan": binding_plan,
+                "min_args": min_args,
+                "arg_index": arg_index,
                 "default_manager": default_manager,
-                "is_matched": False,
-                "need_at": need_at,
-                "num_at": num_at,
-                "at_name_list": at_name_list,
-                "result": {},
+                "segment_slots": segment_slots,
+                "rest": rest,
+                "max_length": (
+                    max_length
+                    if max_length is not None
+                    else get_config().args_patch_max_length
+                ),
+                "metrics": (
+                    metrics.command(command_name)
+                    if get_config().args_patch_metrics
+                    else None
+                ),
+                "help": CommandHelp(
+                    command=cmd,
+                    need_help=need_help,
+                    args_help=command_help_list,
+                    name=command_name,
+                    scope=scope,
+                ),
             },
         )
         return new_args
@@ -112,62 +231,226 @@ class Args(Generic[T]):
         """检测该args是否全为Default"""
         return all(isinstance(arg, Default) for _, arg in cls.args_list)
 
+    @classmethod
     async def match(
-        self,
+        cls,
         bot: Bot,
         event: Event,
         matcher: Matcher,
-    ) -> None:
-        """进行匹配"""
+    ) -> ArgsResult:
+        """
+        说明:
+            进行匹配，每次调用都会返回新的匹配结果
+
+        返回:
+            * `ArgsResult`：本次调用的参数匹配结果
+        """
+        result, default_slots = cls.parse(matcher)
+        await cls.resolve_defaults(result, default_slots, bot, event, matcher)
+        return result
+
+    @classmethod
+    def parse(cls, matcher: Matcher) -> Tuple[ArgsResult, Tuple[DefaultSlot, ...]]:
+        """
+        说明:
+            匹配at参数和用户参数，不获取默认值
+
+        返回:
+            * `ArgsResult`：已填入用户参数的匹配结果
+            * `Tuple[DefaultSlot, ...]`：还需要获取默认值的槽位
+
+        异常:
+            * `CommandArgException`：用户参数错误，由调用者按日志策略记录
+        """
+        result = ArgsResult(cls.arg_index)
         args_msg: Message = matcher.state[PREFIX_KEY][CMD_ARG_KEY]
-        # 匹配at参数
-        if self.need_at:
-            at_msg: Message = args_msg["at"]
-            if len(at_msg) != self.num_at:
-                msg = "at目标数量不对"
-                logger.error(msg)
-                raise CommandArgException(msg)
-            for name, segment in zip(self.at_name_list, at_msg):
-                self.result[name] = segment
+        # 匹配消息段参数，与文本一起在一次遍历中取出
+        if cls.segment_slots:
+            arg_text = cls.scan(args_msg, result)
+        else:
+            arg_text = args_msg.extract_plain_text()
 
         # 匹配字符串参数
-        arg_text = args_msg.extract_plain_text()
-        args_list = shlex.split(arg_text)
-        required_arg = [arg for _, arg in self.args_list if isinstance(arg, Require)]
-        if len(args_list) < len(required_arg):
+        if cls.max_length is not None and len(arg_text) > cls.max_length:
+            msg = "命令传入参数过长"
+            raise CommandArgException(msg)
+        if cls.rest is not None:
+            return cls.parse_rest(result, arg_text)
+        try:
+            # 多分出一个参数就足以判断是否过多，剩余文本不再扫描
+            args_list = split_args(arg_text, cls.num_args + 1)
+        except ValueError:
+            msg = "命令参数引号未闭合"
+            raise CommandArgException(msg)
+        if len(args_list) > cls.num_args:
+            msg = "命令传入参数过多"
+            raise CommandArgException(msg)
+        return cls.bind(result, args_list)
+
+    @classmethod
+    def check(cls, args_msg: Message) -> bool:
+        """
+        说明:
+            只检查参数结构：消息段数量、参数文本长度和用户参数数量，不转换类型、不获取默认值
+
+            分词最多扫描到判断数量所需的参数为止
+        """
+        segment_slots = cls.segment_slots
+        if segment_slots:
+            counts = dict.fromkeys(segment_slots, 0)
+            texts: List[str] = []
+            for segment in args_msg:
+                if segment.is_text():
+                    texts.append(str(segment))
+                elif segment.type in counts:
+                    counts[segment.type] += 1
+            for segment_type, slots in segment_slots.items():
+                if counts[segment_type] != len(slots):
+                    return False
+            arg_text = "".join(texts)
+        else:
+            arg_text = args_msg.extract_plain_text()
+        if cls.max_length is not None and len(arg_text) > cls.max_length:
+            return False
+        spans = iter_spans(arg_text)
+        if cls.rest is not None:
+            # 剩余参数都属于Rest，只需要够最少数量
+            return sum(1 for _ in islice(spans, cls.min_args)) == cls.min_args
+        num = sum(1 for _ in islice(spans, cls.num_args + 1))
+        return cls.min_args <= num <= cls.num_args
+
+    @classmethod
+    def scan(cls, args_msg: Message, result: ArgsResult) -> str:
+        """
+        说明:
+            遍历一次消息段，按顺序绑定消息段参数，同时拼接纯文本，不复制`Message`
+
+        返回:
+            * `str`：纯文本，与`Message.extract_plain_text`一致
+
+        异常:
+            * `CommandArgException`：消息段数量不对
+        """
+        segment_slots = cls.segment_slots
+        found: Dict[str, List[MessageSegment]] = {
+            segment_type: [] for segment_type in segment_slots
+        }
+        texts: List[str] = []
+        for segment in args_msg:
+            if segment.is_text():
+                texts.append(str(segment))
+            elif (segments := found.get(segment.type)) is not None:
+                segments.append(segment)
+        values = result.values
+        for segment_type, slots in segment_slots.items():
+            segments = found[segment_type]
+            if len(segments) != len(slots):
+                msg = f"{get_segment_name(segment_type)}数量不对"
+                raise CommandArgException(msg)
+            for index, segment in zip(slots, segments):
+                values[index] = segment
+        return "".join(texts)
+
+    @classmethod
+    def parse_rest(
+        cls, result: ArgsResult, arg_text: str
+    ) -> Tuple[ArgsResult, Tuple[DefaultSlot, ...]]:
+        """
+        说明:
+            有`Rest`参数时匹配用户参数，前面的参数取完后，剩余文本不再扫描
+
+        异常:
+            * `CommandArgException`：用户参数错误
+        """
+        spans = list(islice(iter_spans(arg_text), cls.num_args))
+        args_list = [unquote(arg_text[start:end]) for start, end in spans]
+        if len(spans) < cls.num_args:
+            pos = len(arg_text)
+        else:
+            pos = spans[-1][1] if spans else 0
+        index, arg, label = cls.rest
+        result.values[index] = RestArgs(arg_text, pos, arg, label)
+        return cls.bind(result, args_list)
+
+    @classmethod
+    def bind(
+        cls, result: ArgsResult, args_list: List[str]
+    ) -> Tuple[ArgsResult, Tuple[DefaultSlot, ...]]:
+        """
+        说明:
+            按绑定表填入用户参数，并进行类型转换
+
+        异常:
+            * `CommandArgException`：参数不足或类型转换失败
+        """
+        plan = cls.binding_plan[len(args_list)]
+        if plan is None:
             msg = "命令传入参数不足"
-            logger.error(msg)
             raise CommandArgException(msg)
 
-        need_default_num = self.num_args - len(args_list)
-        if need_default_num < 0:
-            msg = "命令传入参数过多"
-            logger.error(msg)
+        token_slots, default_slots = plan
+        values = result.values
+        errors: List[str] = []
+        for index, token, arg, label in token_slots:
+            value = args_list[token]
+            if arg.type_ is not None:
+                try:
+                    value = arg.type_(value)
+                except Exception:
+                    errors.append(f"参数{label}应为{get_type_name(arg.type_)}")
+                    continue
+            values[index] = value
+        if errors:
+            msg = "，".join(errors)
             raise CommandArgException(msg)
+        return result, default_slots
 
-        default_gennerate = self.default_manager.get_arg()
-        need_get_defult_num = len(self.default_manager) - need_default_num
-        get_default_arg = [next(default_gennerate) for _ in range(need_get_defult_num)]
-        count = 0
-        for name, arg in self.args_list:
-            if isinstance(arg, Default):
-                if arg in get_default_arg:
-                    self.result[name] = args_list[count]
-                    count += 1
-                else:
-                    if arg.is_callable:
-                        self.result[name] = await arg.func(
-                            bot=bot,
-                            event=event,
-                            matcher=matcher,
-                            state=matcher.state,
-                        )
-                    else:
-                        self.result[name] = arg.value
+    @classmethod
+    async def resolve_defaults(
+        cls,
+        result: ArgsResult,
+        default_slots: Tuple[DefaultSlot, ...],
+        bot: Bot,
+        event: Event,
+        matcher: Matcher,
+    ) -> None:
+        """获取默认值并填入匹配结果"""
+        values = result.values
+        # 默认值函数之间互不依赖，并发获取
+        pending: List[Tuple[int, Awaitable[Any]]] = []
+        for index, default in default_slots:
+            if default.is_callable:
+                pending.append((index, default.resolve(bot, event, matcher)))
             else:
-                self.result[name] = args_list[count]
-                count += 1
-        self.is_matched = True
+                values[index] = default.value
+        if len(pending) == 1:
+            index, coro = pending[0]
+            values[index] = await coro
+        elif pending:
+            results = await asyncio.gather(
+                *(coro for _, coro in pending), return_exceptions=True
+            )
+            for (index, _), value in zip(pending, results):
+                if isinstance(value, BaseException):
+                    raise value
+                values[index] = value
+
+
+def merge_defaults(
+    kwargs: Dict[str, Arg], defaults: Mapping[str, Default]
+) -> Dict[str, Arg]:
+    """
+    说明:
+        把命令没有声明的共享`Default`加在命令参数之后，`Rest`参数仍在最后
+
+        共享的是同一个`Default`对象，默认值函数只解析一次，缓存也在命令间共享
+    """
+    items = list(kwargs.items())
+    rest = items.pop() if items and isinstance(items[-1][1], Rest) else None
+    items.extend((name, arg) for name, arg in defaults.items() if name not in kwargs)
+    if rest is not None:
+        items.append(rest)
+    return dict(items)
 
 
 def on_command(
@@ -182,7 +465,13 @@ def on_command(
     block: bool = False,
     need_space: bool = False,
     need_help: bool = True,
+    max_length: Optional[int] = None,
+    scope: Hashable = None,
+    defaults: Optional[Mapping[str, Default]] = None,
+    provider_class: Optional[Type[ArgsProvider]] = None,
+    rule_check: Optional[bool] = None,
     _depth: int = 0,
+    _batch: Optional["CommandBatch"] = None,
     **kwargs,
 ) -> Type[Matcher]:
     """注册一个消息事件响应器，并且当消息以指定命令开头时响应。
@@ -201,34 +490,197 @@ def on_command(
         * `block`: 是否阻止事件向更低优先级传递
         * `need_space`: 命令与参数之间是否需要空格
         * `need_help`: 是否需要相似命令检验
+        * `max_length`: 参数文本最大长度，超过时直接返回帮助，默认使用配置`args_patch_max_length`
+        * `scope`: 相似命令提示范围，只向属于该范围的事件提示，范围的权限为第一次使用该范围时的`permission`；
+            默认以`permission`的检查函数为范围，检查函数相同的命令属于同一范围，不设置`permission`时对所有人提示
+        * `defaults`: 共享的`Default`参数，命令没有声明的会加在命令参数之后（`Rest`参数之前）
+        * `provider_class`: 存放`Default`参数的存储器类，默认使用`DefaultManager.provider_class`
+        * `rule_check`: 是否在规则中检查参数数量和消息段数量，不符合时不选中该命令，
+            默认使用配置`args_patch_rule_check`
 
     命令参数:
         * `Require`：用户必须填写的参数
         * `AtRequire`：指令at的目标
+        * `SegmentRequire`：非文本消息段，如图片
         * `Default`：拥有默认值的参数
     """
     commands = {cmd} | (aliases or set())
+    command_name = cmd if isinstance(cmd, str) else ".".join(cmd)
+    if scope is None:
+        scope = CommandHelper.get_permission_scope(permission)
+    if defaults:
+        kwargs = merge_defaults(kwargs, defaults)
+    if _batch is not None and command_name not in metrics.commands:
+        _batch.metric_names.append(command_name)
     try:
-        args = Args.new(commands, need_help, **kwargs)
+        args = Args.new(
+            commands,
+            need_help,
+            max_length,
+            command_name,
+            scope,
+            provider_class,
+            **kwargs,
+        )
         default_state: T_State = {ARGSTYPE: args}
     except TypeError as e:
         raise TypeError(e)
-    _rule = (
-        space_command(args.check_is_all_default(), *commands)
-        if need_space
-        else command(*commands)
-    )
-    return on_message(
-        _rule & rule,
-        permission=permission,
-        block=block,
-        handlers=handlers,
-        temp=temp,
-        expire_time=expire_time,
-        priority=priority,
-        state=default_state,
-        _depth=_depth + 1,
-    )
+    if rule_check is None:
+        rule_check = get_config().args_patch_rule_check
+    if _batch is not None:
+        _batch.helps.append((commands, args.help))
+        _batch.scopes.append((scope, permission))
+        _rule = (
+            space_command(
+                args.check_is_all_default(),
+                *commands,
+                deferred=_batch.prefixes,
+                deferred_bare=_batch.bare,
+            )
+            if need_space
+            else deferred_command(*commands, deferred=_batch.prefixes)
+        )
+        if rule_check:
+            _rule = check_args(_rule, args)
+        matcher = _batch.on_message(
+            _rule & rule,
+            permission=permission,
+            block=block,
+            handlers=handlers,
+            temp=temp,
+            expire_time=expire_time,
+            priority=priority,
+            state=default_state,
+        )
+        _batch.bindings.append((args.help, matcher))
+    else:
+        CommandHelper.add_scope(scope, permission)
+        CommandHelper.add_command(names=commands, command=args.help)
+        _rule = (
+            space_command(args.check_is_all_default(), *commands)
+            if need_space
+            else command(*commands)
+        )
+        if rule_check:
+            _rule = check_args(_rule, args)
+        matcher = on_message(
+            _rule & rule,
+            permission=permission,
+            block=block,
+            handlers=handlers,
+            temp=temp,
+            expire_time=expire_time,
+            priority=priority,
+            state=default_state,
+            _depth=_depth + 1,
+        )
+        CommandHelper.bind(args.help, matcher)
+    # 只替换本模块创建的matcher类，其他matcher仍使用nb2的simple_run
+    matcher.simple_run = simple_run
+    if get_config().args_patch_dispatch:
+        Dispatcher.add(matcher, commands, need_space and args.check_is_all_default())
+    return matcher
+
+
+class CommandBatch:
+    """
+    说明:
+        一次批量注册，由`CommandGroup.batch`创建
+
+        * 事件响应器所在模块只在批量注册开始时查找一次
+        * 命令帮助、提示范围、`TrieRule`前缀和无参数命令文本在结束时统一添加，命令冲突一次性检查
+        * 注册失败时移除本次创建的事件响应器和命令统计，不会留下任何索引
+    """
+
+    module: Optional[ModuleType]
+    """事件响应器所在模块"""
+    plugin: Optional[Plugin]
+    """事件响应器所在插件"""
+    helps: List[Tuple[Set[str], CommandHelp]]
+    """待添加的命令帮助"""
+    prefixes: List[Prefix]
+    """待添加的`TrieRule`前缀"""
+    bare: List[Prefix]
+    """待添加到`BareCommandIndex`的无参数命令文本"""
+    scopes: List[Tuple[Hashable, Optional[Union[Permission, T_PermissionChecker]]]]
+    """待登记的提示范围及其权限"""
+    metric_names: List[str]
+    """本次新建的命令统计"""
+    matchers: List[Type[Matcher]]
+    """本次创建的事件响应器"""
+    bindings: List[Tuple[CommandHelp, Type[Matcher]]]
+    """命令帮助及其所属的事件响应器"""
+
+    def __init__(self, module: Optional[ModuleType]) -> None:
+        plugin_chain = _current_plugin_chain.get()
+        self.module = module
+        self.plugin = plugin_chain[-1] if plugin_chain else None
+        self.helps = []
+        self.prefixes = []
+        self.bare = []
+        self.scopes = []
+        self.metric_names = []
+        self.matchers = []
+        self.bindings = []
+
+    def on_message(
+        self,
+        rule: Optional[Union[Rule, T_RuleChecker]] = None,
+        permission: Optional[Union[Permission, T_PermissionChecker]] = None,
+        *,
+        handlers: Optional[List[Union[T_Handler, Dependent]]] = None,
+        temp: bool = False,
+        expire_time: Optional[Union[datetime, timedelta]] = None,
+        priority: int = 1,
+        block: bool = True,
+        state: Optional[T_State] = None,
+    ) -> Type[Matcher]:
+        """与nb2的`on_message`相同，但使用批量注册开始时查找的模块"""
+        matcher = Matcher.new(
+            "message",
+            Rule() & rule,
+            Permission() | permission,
+            temp=temp,
+            expire_time=expire_time,
+            priority=priority,
+            block=block,
+            handlers=handlers,
+            plugin=self.plugin,
+            module=self.module,
+            default_state=state,
+        )
+        _store_matcher(matcher)
+        self.matchers.append(matcher)
+        return matcher
+
+    def commit(self) -> None:
+        """
+        说明:
+            添加命令帮助、提示范围和前缀
+
+        异常:
+            * `KeyError`：命令冲突，此时不会添加任何命令帮助和前缀
+        """
+        CommandHelper.add_commands(self.helps)
+        for scope, permission in self.scopes:
+            CommandHelper.add_scope(scope, permission)
+        for command, matcher in self.bindings:
+            CommandHelper.bind(command, matcher)
+        add_prefixes(self.prefixes)
+        BareCommandIndex.add(self.bare)
+
+    def abort(self) -> None:
+        """移除本次创建的事件响应器和命令统计"""
+        for matcher in self.matchers:
+            if matcher in matchers[matcher.priority]:
+                matchers[matcher.priority].remove(matcher)
+            if self.plugin is not None:
+                self.plugin.matcher.discard(matcher)
+            Dispatcher.remove(matcher)
+        self.matchers.clear()
+        for name in self.metric_names:
+            metrics.commands.pop(name, None)
+        self.metric_names.clear()
 
 
 class CommandGroup:
@@ -245,7 +697,13 @@ class CommandGroup:
     block: bool
     need_space: bool
     need_help: bool
+    max_length: Optional[int]
+    scope: Hashable
+    defaults: Optional[Mapping[str, Default]]
+    provider_class: Optional[Type[ArgsProvider]]
+    rule_check: Optional[bool]
     _depth: int
+    _batch: Optional[CommandBatch]
 
     def __init__(
         self,
@@ -258,6 +716,11 @@ class CommandGroup:
         block: bool = False,
         need_space: bool = False,
         need_help: bool = True,
+        max_length: Optional[int] = None,
+        scope: Hashable = None,
+        defaults: Optional[Mapping[str, Default]] = None,
+        provider_class: Optional[Type[ArgsProvider]] = None,
+        rule_check: Optional[bool] = None,
         _depth: int = 0,
     ) -> None:
         self.rule = rule
@@ -269,7 +732,48 @@ class CommandGroup:
         self.block = block
         self.need_space = need_space
         self.need_help = need_help
+        self.max_length = max_length
+        self.scope = scope
+        self.defaults = defaults
+        self.provider_class = provider_class
+        self.rule_check = rule_check
         self._depth = _depth
+        self._batch = None
+
+    @contextmanager
+    def batch(self, _depth: int = 0) -> Iterator["CommandGroup"]:
+        """
+        说明:
+            批量注册命令，适合启动时注册大量命令
+
+            * 事件响应器所在模块只查找一次，`on_command`的`_depth`参数不再生效
+            * 命令帮助、相似命令索引和`TrieRule`前缀在退出时统一构建
+            * 命令冲突在退出时一次性检查，抛出的`KeyError`包含全部冲突的命令；
+                出现冲突或异常时，本次创建的事件响应器都会被移除
+
+        用法:
+
+        ```python
+        group = CommandGroup(priority=5, need_space=True)
+        with group.batch():
+            weather = group.on_command("天气", city=Require())
+            sign = group.on_command("签到")
+        ```
+        """
+        if self._batch is not None:
+            raise RuntimeError("命令组已经在批量注册中")
+        # 0为本函数，1为contextmanager的__enter__
+        frame = sys._getframe(2 + _depth)
+        batch = CommandBatch(sys.modules.get(frame.f_globals.get("__name__", "")))
+        self._batch = batch
+        try:
+            yield self
+            batch.commit()
+        except BaseException:
+            batch.abort()
+            raise
+        finally:
+            self._batch = None
 
     def on_command(
         self,
@@ -284,6 +788,11 @@ class CommandGroup:
         block: bool = None,
         need_space: bool = None,
         need_help: bool = None,
+        max_length: Optional[int] = None,
+        scope: Hashable = None,
+        defaults: Optional[Mapping[str, Default]] = None,
+        provider_class: Optional[Type[ArgsProvider]] = None,
+        rule_check: Optional[bool] = None,
         _depth: int = None,
         **kwargs,
     ) -> Type[Matcher]:
@@ -303,10 +812,16 @@ class CommandGroup:
         * `block`: 是否阻止事件向更低优先级传递
         * `need_space`: 命令与参数之间是否需要空格
         * `need_help`: 是否需要相似命令检验
+        * `max_length`: 参数文本最大长度，超过时直接返回帮助
+        * `scope`: 相似命令提示范围
+        * `defaults`: 共享的`Default`参数
+        * `provider_class`: 存放`Default`参数的存储器类
+        * `rule_check`: 是否在规则中检查参数结构
 
         命令参数:
             * `Require`：用户必须填写的参数
             * `AtRequire`：指令at的目标
+            * `SegmentRequire`：非文本消息段，如图片
             * `Default`：拥有默认值的参数
         """
         rule = rule or self.rule
@@ -318,6 +833,12 @@ class CommandGroup:
         block = block or self.block
         need_space = need_space or self.need_space
         need_help = need_help or self.need_help
+        max_length = max_length or self.max_length
+        scope = self.scope if scope is None else scope
+        defaults = defaults or self.defaults
+        provider_class = provider_class or self.provider_class
+        if rule_check is None:
+            rule_check = self.rule_check
         _depth = _depth or self._depth
         return on_command(
             cmd=cmd,
@@ -331,7 +852,13 @@ class CommandGroup:
             block=block,
             need_space=need_space,
             need_help=need_help,
+            max_length=max_length,
+            scope=scope,
+            defaults=defaults,
+            provider_class=provider_class,
+            rule_check=rule_check,
             _depth=_depth,
+            _batch=self._batch,
             **kwargs,
         )
 
@@ -354,6 +881,10 @@ def get_args(
 
     返回:
         * `Any`：你获取到的参数
+
+    注意:
+        * 同一次调用中，相同参数和`result_type`的转换结果会被缓存
+        * 推荐在`Require`、`Default`中声明`type_`，参数错误会在匹配时与帮助信息一起返回
     """
 
     async def _get_args(
@@ -361,26 +892,26 @@ def get_args(
         state: T_State,
     ) -> Any:
         try:
-            args: Args = state[ARGS]
+            args: ArgsResult = state[ARGS]
         except KeyError:
             logger.error("未获取到Args对象")
             matcher.skip()
 
-        result = args.result.get(arg_name, None)
+        result = args.get(arg_name, None)
         if result is None:
             logger.error(f"未找到{arg_name}的参数")
             matcher.skip()
         if result_type == str:
-            result = str(result)
+            result = args.convert(arg_name, str)
         elif result_type == int:
             try:
-                result = int(result)
+                result = args.convert(arg_name, int)
             except ValueError:
                 logger.error(f"在尝试将参数[{arg_name}]: {result} 转换为int时出错")
                 matcher.skip()
         elif callable(result_type):
             try:
-                result = result_type(result)
+                result = args.convert(arg_name, result_type)
             except Exception:
                 logger.error(f"在尝试将参数[{arg_name}]运行转换[{result_type.__name__}]时出错")
                 matcher.skip()
@@ -0,0 +1,58 @@
+from typing import Optional
+
+from nonebot import get_driver
+from pydantic import BaseModel, Extra
+
+
+class Config(BaseModel, extra=Extra.ignore):
+    """
+    补丁配置，在nb2的`.env`文件中填写
+    """
+
+    args_patch_tokenizer: str = "fast"
+    """参数分词器：`fast`为内置分词器，可容忍未闭合的引号；`shlex`为`shlex.split`"""
+    args_patch_max_length: Optional[int] = None
+    """命令参数文本的默认最大长度，超过时不进行分词，为`None`时不限制"""
+    args_patch_metrics: bool = True
+    """是否记录每个命令的计数和延迟统计"""
+    args_patch_dispatch: bool = False
+    """是否由每个优先级共享的分发matcher查表运行命令，而不是逐个检查命令matcher"""
+    args_patch_rule_check: bool = False
+    """是否在命令规则中检查参数数量和消息段数量，不符合时不选中该命令，事件继续传播"""
+    args_patch_help_window: float = 30.0
+    """同一用户、同一群内同一命令的提示在该时间（秒）内只发送一次，为0时不去重"""
+    args_patch_help_group_limit: int = 10
+    """每个群（会话）在`args_patch_help_group_window`秒内最多发送的提示数，为0时不限制"""
+    args_patch_help_group_window: float = 60.0
+    """群提示数上限的时间窗口（秒）"""
+    args_patch_log_level: Optional[str] = None
+    """补丁输出日志的最低等级，为`None`时使用nb2的`log_level`"""
+    args_patch_log_user_error_level: str = "INFO"
+    """用户参数错误的日志等级"""
+    args_patch_log_complete_level: str = "INFO"
+    """命令运行完成的日志等级"""
+    args_patch_log_interval: float = 60.0
+    """日志限流的时间窗口（秒），为0时不限流"""
+    args_patch_log_burst: int = 5
+    """每个命令、每个用户在一个时间窗口内最多输出的参数错误日志数，为0时不限流"""
+
+
+_config: Optional[Config] = None
+
+
+def get_config() -> Config:
+    """
+    说明:
+        获取补丁配置，nb2初始化之前返回默认配置
+
+    返回:
+        * `Config`：补丁配置
+    """
+    global _config
+    if _config is None:
+        try:
+            config = get_driver().config
+        except ValueError:
+            return Config()
+        _config = Config.parse_obj(config)
+    return _config
@@ -1,6 +1,10 @@
 ARGSTYPE = "_bot_args_type"
 """args类参数"""
 ARGS = "_bot_args_stance"
-"""args实例"""
+"""args匹配结果"""
 PRIORITY = 99
 """帮助matcher优先级"""
+HELP_CACHE_SIZE = 1024
+"""帮助matcher未命中缓存的大小"""
+DISPATCH = "_bot_args_dispatch"
+"""分发matcher匹配到的命令matcher"""
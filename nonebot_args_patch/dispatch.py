@@ -0,0 +1,177 @@
+import asyncio
+from contextlib import AsyncExitStack, suppress
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple, Type, Union
+
+from nonebot.consts import CMD_KEY, PREFIX_KEY
+from nonebot.exception import StopPropagation
+from nonebot.internal.adapter import Bot, Event
+from nonebot.internal.matcher import Matcher, matchers
+from nonebot.internal.rule import Rule
+from nonebot.log import logger
+from nonebot.message import _run_matcher
+from nonebot.typing import T_DependencyCache, T_State
+
+from .consts import DISPATCH
+from .helper import CommandHelper
+from .rule import BareCommandIndex
+
+
+class DispatchRule:
+    """分发matcher的规则，查表找出本条消息对应的命令matcher"""
+
+    __slots__ = ("commands", "bare")
+
+    commands: Dict[Tuple[str, ...], Type[Matcher]]
+    """命令 -> 命令matcher"""
+    bare: Dict[Tuple[str, ...], Type[Matcher]]
+    """不带参数也能触发的命令 -> 命令matcher，通过`BareCommandIndex`查找"""
+
+    def __init__(self) -> None:
+        self.commands = {}
+        self.bare = {}
+
+    async def __call__(self, event: Event, state: T_State) -> bool:
+        found: List[Type[Matcher]] = []
+        prefix = state.get(PREFIX_KEY)
+        if prefix and prefix[CMD_KEY] is not None:
+            matcher = self.commands.get(prefix[CMD_KEY])
+            if matcher is not None:
+                found.append(matcher)
+        if self.bare and (result := BareCommandIndex.lookup(event)):
+            for value in result[1]:
+                matcher = self.bare.get(value.command)
+                if matcher is not None and matcher not in found:
+                    found.append(matcher)
+        if found:
+            state[DISPATCH] = found
+            return True
+        return False
+
+
+class Dispatcher:
+    """
+    说明:
+        命令分发，开启配置`args_patch_dispatch`后使用
+
+        * 每个优先级只有一个分发matcher留在nb2的`matchers`中，命令matcher从中移出
+        * 分发matcher按TrieRule匹配到的命令查表，开销与命令数量无关
+        * 命令matcher仍按nb2的流程检查权限和规则、运行pre/postprocessor，
+            `temp`、`expire_time`和`block`行为不变
+    """
+
+    rules: Dict[int, DispatchRule] = {}
+    """优先级 -> 分发规则"""
+    dispatchers: Dict[int, Type[Matcher]] = {}
+    """优先级 -> 分发matcher"""
+
+    @classmethod
+    def get_rule(cls, priority: int) -> DispatchRule:
+        """获取优先级对应的分发规则，不存在时创建分发matcher"""
+        try:
+            return cls.rules[priority]
+        except KeyError:
+            rule = cls.rules[priority] = DispatchRule()
+            dispatcher = Matcher.new("message", Rule(rule), priority=priority)
+            dispatcher.run = dispatch_run
+            cls.dispatchers[priority] = dispatcher
+            return rule
+
+    @classmethod
+    def add(
+        cls,
+        matcher: Type[Matcher],
+        commands: Iterable[Union[str, Tuple[str, ...]]],
+        bare: bool = False,
+    ) -> None:
+        """
+        说明:
+            将命令matcher移入分发表
+
+        参数:
+            * `matcher`：命令matcher
+            * `commands`：命令及别名
+            * `bare`：命令只有文本、不带参数时是否也能触发，对应`need_space`且参数全为`Default`
+        """
+        priority = matcher.priority
+        with suppress(ValueError):
+            matchers[priority].remove(matcher)
+        rule = cls.get_rule(priority)
+        CommandHelper.dispatched.add(matcher)
+        for command in commands:
+            if isinstance(command, str):
+                command = (command,)
+            rule.commands[command] = matcher
+            if bare:
+                rule.bare[command] = matcher
+
+    @classmethod
+    def remove(cls, matcher: Type[Matcher]) -> None:
+        """将命令matcher移出分发表，同时移除其命令帮助"""
+        CommandHelper.remove_matcher(matcher)
+        rule = cls.rules.get(matcher.priority)
+        if rule is None:
+            return
+        for table in (rule.commands, rule.bare):
+            for key in [key for key, value in table.items() if value is matcher]:
+                del table[key]
+
+    @classmethod
+    async def check_and_run(
+        cls,
+        matcher: Type[Matcher],
+        bot: Bot,
+        event: Event,
+        state: T_State,
+        stack: Optional[AsyncExitStack] = None,
+        dependency_cache: Optional[T_DependencyCache] = None,
+    ) -> None:
+        """与nb2的`_check_matcher`一致，但过期和临时matcher从分发表中移除"""
+        if matcher.expire_time and datetime.now() > matcher.expire_time:
+            cls.remove(matcher)
+            return
+
+        try:
+            if not await matcher.check_perm(
+                bot, event, stack, dependency_cache
+            ) or not await matcher.check_rule(
+                bot, event, state, stack, dependency_cache
+            ):
+                return
+        except Exception as e:
+            logger.opt(colors=True, exception=e).error(
+                f"<r><bg #f8bbd0>Rule check failed for {matcher}.</bg #f8bbd0></r>"
+            )
+            return
+
+        if matcher.temp:
+            cls.remove(matcher)
+        await _run_matcher(matcher, bot, event, state, stack, dependency_cache)
+
+
+async def dispatch_run(
+    self: Matcher,
+    bot: Bot,
+    event: Event,
+    state: T_State,
+    stack: Optional[AsyncExitStack] = None,
+    dependency_cache: Optional[T_DependencyCache] = None,
+) -> None:
+    """分发matcher的`run`，运行查表得到的命令matcher"""
+    found: List[Type[Matcher]] = state.pop(DISPATCH, [])
+    results = await asyncio.gather(
+        *(
+            Dispatcher.check_and_run(
+                matcher, bot, event, state.copy(), stack, dependency_cache
+            )
+            for matcher in found
+        ),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, StopPropagation):
+            self.block = True
+        elif isinstance(result, Exception):
+            logger.opt(colors=True, exception=result).error(
+                "<r><bg #f8bbd0>Error when checking Matcher.</bg #f8bbd0></r>"
+            )
@@ -1,35 +1,111 @@
-from difflib import get_close_matches
-from typing import Dict, List, Optional, Set
+from collections import OrderedDict
+from datetime import datetime
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    Hashable,
+    Iterable,
+    List,
+    NoReturn,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
+from weakref import WeakKeyDictionary, WeakSet, ref
 
-from pydantic import BaseModel
+from nonebot.internal.adapter import Bot, Event
+from nonebot.internal.matcher import Matcher, matchers
+from nonebot.internal.permission import Permission
+from nonebot.typing import T_PermissionChecker
 
+from .consts import HELP_CACHE_SIZE
+from .index import SimilarIndex
+from .tokenizer import SPECIAL_CHARS, WHITESPACE, split_args
+
+
+class _Record:
+    """只读记录，创建后不能修改属性"""
+
+    __slots__ = ()
+
+    def __setattr__(self, name: str, value: Any) -> NoReturn:
+        raise AttributeError(f"{type(self).__name__}是只读的")
+
+    def __delattr__(self, name: str) -> NoReturn:
+        raise AttributeError(f"{type(self).__name__}是只读的")
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class OneArgHelp(_Record):
+    """单个参数的提示信息"""
+
+    __slots__ = ("name", "optional", "msg")
 
-class OneArgHelp(BaseModel):
     name: str
     """提示内容"""
     optional: bool
     """是否可选"""
+    msg: str
+    """提示消息，创建时生成"""
+
+    def __init__(self, name: str, optional: bool) -> None:
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "optional", optional)
+        object.__setattr__(self, "msg", f"[{name}]" if optional else name)
 
     def get_msg(self) -> str:
         """获取消息"""
-        return f"[{self.name}]" if self.optional else self.name
+        return self.msg
 
 
-class CommandHelp(BaseModel):
-    """命令提示信息"""
+class CommandHelp(_Record):
+    """
+    说明:
+        命令提示信息，提示消息在注册时生成，发送提示时不再拼接
+    """
 
-    command: Set[str]
+    __slots__ = ("command", "need_help", "args_help", "name", "scope", "help_msg")
+
+    command: FrozenSet[str]
     """指令名"""
     need_help: bool
     """是否需要相似度检验"""
-    args_help: List[OneArgHelp]
+    args_help: Tuple[OneArgHelp, ...]
     """参数列表"""
+    name: str
+    """统计使用的命令名"""
+    scope: Hashable
+    """提示范围，为`None`时对所有人提示"""
+    help_msg: str
+    """指令提示消息，创建时生成"""
+
+    def __init__(
+        self,
+        command: Iterable[str],
+        need_help: bool,
+        args_help: Iterable[OneArgHelp],
+        name: str = "",
+        scope: Hashable = None,
+    ) -> None:
+        command = frozenset(command)
+        args_help = tuple(args_help)
+        arg_help = " ".join(one_arg.msg for one_arg in args_help)
+        object.__setattr__(self, "command", command)
+        object.__setattr__(self, "need_help", need_help)
+        object.__setattr__(self, "args_help", args_help)
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "scope", scope)
+        object.__setattr__(self, "help_msg", f"{'/'.join(command)} {arg_help}")
 
     def get_help_msg(self) -> str:
         """获取指令提示消息"""
-        arg_help = " ".join(one_arg.get_msg() for one_arg in self.args_help)
-        command = "/".join(self.command)
-        return f"{command} {arg_help}"
+        return self.help_msg
 
 
 class CommandHelper:
@@ -37,23 +113,300 @@ class CommandHelper:
 
     command_dict: Dict[str, CommandHelp] = {}
     """命令字典"""
+    indexes: Dict[Hashable, SimilarIndex] = {}
+    """提示范围 -> 相似命令索引"""
+    scopes: Dict[Hashable, Optional[Permission]] = {}
+    """提示范围 -> 判断事件是否属于该范围的权限，为`None`时所有事件都属于该范围"""
+    miss_cache: "OrderedDict[Tuple[str, Tuple[Hashable, ...]], None]" = OrderedDict()
+    """最近没有找到相似命令的(消息开头, 提示范围)，LRU"""
+    owners: "Dict[CommandHelp, ref[Type[Matcher]]]" = {}
+    """指令 -> 所属matcher的弱引用"""
+    bound: "WeakKeyDictionary[Type[Matcher], CommandHelp]" = WeakKeyDictionary()
+    """matcher -> 指令"""
+    dispatched: "WeakSet[Type[Matcher]]" = WeakSet()
+    """由分发matcher管理的matcher，移出分发表时会主动移除指令"""
+    dead: List[CommandHelp] = []
+    """matcher已被回收、等待移除的指令"""
 
     @classmethod
     def add_command(cls, names: Set[str], command: CommandHelp) -> None:
         """
         说明:
-            添加一条指令
+            添加一条指令，已失效的同名指令会被移除
         """
         for name in names:
-            if name in cls.command_dict:
+            if name in cls.command_dict and not cls.release_if_dead(name):
                 raise KeyError("注册了相同指令，引发冲突")
             cls.command_dict[name] = command
+            cls.get_index(command.scope).add(name)
+        cls.miss_cache.clear()
+
+    @classmethod
+    def add_commands(cls, commands: Iterable[Tuple[Set[str], CommandHelp]]) -> None:
+        """
+        说明:
+            批量添加指令，先一次性检查所有冲突，有冲突时不会添加任何指令
+
+        异常:
+            * `KeyError`：与已有指令或同批指令冲突，错误信息包含全部冲突的指令名
+        """
+        command_dict = cls.command_dict
+        new_dict: Dict[str, CommandHelp] = {}
+        conflicts: Set[str] = set()
+        for names, command in commands:
+            for name in names:
+                if name in new_dict or (
+                    name in command_dict and not cls.release_if_dead(name)
+                ):
+                    conflicts.add(name)
+                new_dict[name] = command
+        if conflicts:
+            raise KeyError(f"注册了相同指令，引发冲突：{'，'.join(sorted(conflicts))}")
+        command_dict.update(new_dict)
+        for name, command in new_dict.items():
+            cls.get_index(command.scope).add(name)
+        cls.miss_cache.clear()
+
+    @classmethod
+    def add_scope(
+        cls,
+        scope: Hashable,
+        permission: Optional[Union[Permission, T_PermissionChecker]] = None,
+    ) -> None:
+        """
+        说明:
+            登记提示范围，同一范围只使用第一次登记的权限
+
+        参数:
+            * `scope`：提示范围
+            * `permission`：判断事件是否属于该范围的权限，为`None`时所有事件都属于该范围
+        """
+        if scope is None or scope in cls.scopes:
+            return
+        if permission is not None and not isinstance(permission, Permission):
+            permission = Permission(permission)
+        cls.scopes[scope] = permission
+
+    @staticmethod
+    def get_permission_scope(
+        permission: Optional[Union[Permission, T_PermissionChecker]],
+    ) -> Hashable:
+        """
+        说明:
+            由权限得到默认的提示范围
+
+            * 检查函数相同的权限属于同一范围，如每个命令各自写的`GROUP_ADMIN | GROUP_OWNER`
+            * 没有检查函数时为`None`，即对所有人提示
+
+        参数:
+            * `permission`：命令的权限
+        """
+        if permission is None:
+            return None
+        if not isinstance(permission, Permission):
+            permission = Permission(permission)
+        try:
+            return frozenset(checker.call for checker in permission.checkers) or None
+        except TypeError:
+            # 检查函数不可哈希时按权限对象区分
+            return permission
+
+    @classmethod
+    def get_index(cls, scope: Hashable) -> SimilarIndex:
+        """获取提示范围的索引，不存在时创建"""
+        try:
+            return cls.indexes[scope]
+        except KeyError:
+            index = cls.indexes[scope] = SimilarIndex()
+            return index
+
+    @classmethod
+    def bind(cls, command: CommandHelp, matcher: Type[Matcher]) -> None:
+        """
+        说明:
+            记录指令所属的matcher，matcher失效后指令会被移除，同名指令可以重新注册
+
+            * matcher被回收时，指令在下次查找或注册时移除
+            * `temp`、`expire_time`的matcher被nb2移除后，指令在下次被查找到或同名注册时移除
+        """
+        cls.owners[command] = ref(matcher, lambda _: cls.dead.append(command))
+        cls.bound[matcher] = command
 
     @classmethod
-    def get_similar_commands(cls, name: str) -> Optional[CommandHelp]:
-        """获取相似的命令"""
-        close_commands = get_close_matches(name, cls.command_dict.keys())
-        if close_commands:
-            return cls.command_dict[close_commands[0]]
+    def remove_command(cls, command: CommandHelp) -> None:
+        """移除一条指令及其别名"""
+        index = cls.indexes.get(command.scope)
+        for name in command.command:
+            if cls.command_dict.get(name) is command:
+                del cls.command_dict[name]
+                if index is not None:
+                    index.remove(name)
+        if index is not None and not index.lengths:
+            del cls.indexes[command.scope]
+        cls.owners.pop(command, None)
+
+    @classmethod
+    def remove_matcher(cls, matcher: Type[Matcher]) -> None:
+        """
+        说明:
+            移除matcher的指令，手动从nb2中移除命令matcher后调用
+        """
+        command = cls.bound.pop(matcher, None)
+        cls.dispatched.discard(matcher)
+        if command is not None:
+            cls.remove_command(command)
+
+    @classmethod
+    def is_alive(cls, command: CommandHelp) -> bool:
+        """指令所属的matcher是否仍然有效，未记录matcher的指令视为有效"""
+        owner = cls.owners.get(command)
+        if owner is None:
+            return True
+        matcher = owner()
+        if matcher is None:
+            return False
+        if matcher.expire_time and datetime.now() > matcher.expire_time:
+            return False
+        if matcher in cls.dispatched:
+            return True
+        if matcher.temp or matcher.expire_time:
+            return matcher in matchers.get(matcher.priority, ())
+        return True
+
+    @classmethod
+    def release_if_dead(cls, name: str) -> bool:
+        """
+        说明:
+            已注册的指令失效时移除
+
+        返回:
+            * `bool`：是否已移除
+        """
+        command = cls.command_dict[name]
+        if cls.is_alive(command):
+            return False
+        cls.remove_command(command)
+        return True
+
+    @classmethod
+    def collect(cls) -> None:
+        """移除matcher已被回收的指令"""
+        while cls.dead:
+            cls.remove_command(cls.dead.pop())
+
+    @classmethod
+    def get_similar_commands(
+        cls, name: str, scopes: Optional[Iterable[Hashable]] = None
+    ) -> Optional[CommandHelp]:
+        """
+        说明:
+            获取相似的命令，已失效的命令会被移除
+
+        参数:
+            * `name`：命令文本
+            * `scopes`：查找的提示范围，为`None`时查找全部范围
+        """
+        if cls.dead:
+            cls.collect()
+        indexes = (
+            list(cls.indexes.values())
+            if scopes is None
+            else [cls.indexes[scope] for scope in scopes if scope in cls.indexes]
+        )
+        while True:
+            best = None
+            for index in indexes:
+                result = index.search_with_score(name)
+                if result is not None and (best is None or result[0] > best[0]):
+                    best = result
+            if best is None:
+                return None
+            command = cls.command_dict[best[1]]
+            if cls.is_alive(command):
+                return command
+            cls.remove_command(command)
+
+    @classmethod
+    async def get_scopes(
+        cls, bot: Bot, event: Event, word: str
+    ) -> Tuple[Hashable, ...]:
+        """
+        说明:
+            获取事件所属、且可能有`word`的相似命令的提示范围
+
+            只对可能有相似命令的范围检查权限，普通聊天不会检查权限
+        """
+        scopes = []
+        for scope, index in cls.indexes.items():
+            if not index.could_match(word):
+                continue
+            permission = cls.scopes.get(scope)
+            if permission is not None:
+                try:
+                    if not await permission(bot, event):
+                        continue
+                except Exception:
+                    continue
+            scopes.append(scope)
+        return tuple(scopes)
+
+    @classmethod
+    async def get_help(
+        cls, text: str, bot: Optional[Bot] = None, event: Optional[Event] = None
+    ) -> Optional[CommandHelp]:
+        """
+        说明:
+            根据消息文本获取需要提示的相似命令，供帮助matcher使用
+
+            * 先取出消息开头，只用长度窗口和字符表预过滤，普通聊天不会进行分词和相似度计算
+            * 只查找事件所属的提示范围，不会提示用户没有权限的命令
+            * 近期没有找到相似命令的消息开头会被缓存
+
+        参数:
+            * `text`：消息文本
+            * `bot`、`event`：用于判断提示范围，为`None`时查找全部范围
+
+        返回:
+            * `Optional[CommandHelp]`：需要提示的命令，为`None`时不需要提示
+        """
+        text = text.lstrip(WHITESPACE)
+        if not text:
+            return None
+        end = len(text)
+        for char in WHITESPACE:
+            pos = text.find(char, 0, end)
+            if pos != -1:
+                end = pos
+        command = text[:end]
+        if not SPECIAL_CHARS.isdisjoint(command):
+            # 带引号或转义，需要分词
+            try:
+                args_list = split_args(text, limit=1)
+            except ValueError:
+                return None
+            if len(args_list) == 0:
+                return None
+            command = args_list[0]
+        if bot is None or event is None:
+            scopes = tuple(
+                scope
+                for scope, index in cls.indexes.items()
+                if index.could_match(command)
+            )
         else:
+            scopes = await cls.get_scopes(bot, event, command)
+        if not scopes:
+            return None
+
+        miss_cache = cls.miss_cache
+        key = (command, scopes)
+        if key in miss_cache:
+            miss_cache.move_to_end(key)
+            return None
+        help = cls.get_similar_commands(command, scopes)
+        if help is None or not help.need_help:
+            miss_cache[key] = None
+            if len(miss_cache) > HELP_CACHE_SIZE:
+                miss_cache.popitem(last=False)
             return None
+        return help
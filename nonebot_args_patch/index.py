@@ -0,0 +1,206 @@
+from collections import Counter
+from difflib import SequenceMatcher
+from operator import itemgetter
+from typing import Dict, Hashable, Optional, Sequence, Set, Tuple
+
+
+class SimilarIndex:
+    """
+    说明:
+        相似命令索引，结果与`difflib.get_close_matches`的首个结果一致
+
+        * 使用字符倒排索引统计查询词与每条命令的公共字符数，这正是`quick_ratio`的上界，
+            达不到`cutoff`的命令不会进入`SequenceMatcher`的精确计算
+        * 倒排表按命令长度分桶，长度差距过大（必然达不到`cutoff`）的命令不会被访问
+        * 公共字符数至少为`need`时，命令必然包含查询词中任意`len(word) - need + 1`个字符之一，
+            所以每个长度桶只访问查询词中最稀有的几个字符的倒排表
+        * 查询开销与被访问的倒排表长度成正比，命令共用一个较小的字符集时仍随命令数线性增长，
+            只是常数比逐条计算小得多
+        * 要与`difflib`结果一致就不能按q-gram过滤候选：`axbxc`与`aybyc`的相似度正好为0.6，
+            却没有公共的二元组，所以倒排表只能按单个字符建立
+
+    参数:
+        * `cutoff`：相似度阈值，与`difflib`默认值一致为0.6
+    """
+
+    cutoff: float
+    """相似度阈值"""
+    postings: Dict[Hashable, Dict[int, Dict[Sequence, int]]]
+    """倒排表，字符 -> {命令长度: {命令: 该字符在命令中出现的次数}}"""
+    min_length: int
+    """最短命令长度"""
+    max_length: int
+    """最长命令长度"""
+    lengths: Dict[int, int]
+    """命令长度 -> 该长度的命令数"""
+
+    def __init__(self, cutoff: float = 0.6) -> None:
+        self.cutoff = cutoff
+        self.postings = {}
+        self.min_length = 0
+        self.max_length = 0
+        self.lengths = {}
+
+    def add(self, name: Sequence) -> None:
+        """添加一条命令"""
+        length = len(name)
+        if not self.lengths or length < self.min_length:
+            self.min_length = length
+        if length > self.max_length:
+            self.max_length = length
+        self.lengths[length] = self.lengths.get(length, 0) + 1
+        for char, count in Counter(name).items():
+            self.postings.setdefault(char, {}).setdefault(length, {})[name] = count
+
+    def remove(self, name: Sequence) -> None:
+        """移除一条命令，只更新该命令涉及的倒排表"""
+        length = len(name)
+        found = False
+        for char in set(name):
+            buckets = self.postings.get(char)
+            if not buckets or length not in buckets:
+                continue
+            posting = buckets[length]
+            if posting.pop(name, None) is None:
+                continue
+            found = True
+            if not posting:
+                del buckets[length]
+                if not buckets:
+                    del self.postings[char]
+        if not found:
+            return
+        self.lengths[length] -= 1
+        if self.lengths[length]:
+            return
+        del self.lengths[length]
+        if not self.lengths:
+            self.min_length = self.max_length = 0
+        elif length == self.min_length:
+            self.min_length = min(self.lengths)
+        elif length == self.max_length:
+            self.max_length = max(self.lengths)
+
+    def could_match(self, word: Sequence) -> bool:
+        """
+        说明:
+            只用长度窗口和字符表快速判断查询词是否可能有相似命令，开销远小于`search`
+
+        返回:
+            * `bool`：为`False`时`search`必然返回`None`
+        """
+        if not self.lengths:
+            return False
+        length = len(word)
+        cutoff = self.cutoff
+        if not _reachable(length, length + self.min_length, cutoff):
+            return False
+        if not _reachable(self.max_length, length + self.max_length, cutoff):
+            return False
+        postings = self.postings
+        hits = 0
+        for char in word:
+            if char in postings:
+                hits += 1
+        return 2.0 * hits / (length + self.min_length) >= cutoff
+
+    def search(self, word: Sequence) -> Optional[Sequence]:
+        """
+        说明:
+            查找最相似的命令
+
+        返回:
+            * `Optional[Sequence]`：相似度最高的命令，没有达到阈值时为`None`
+        """
+        result = self.search_with_score(word)
+        return None if result is None else result[1]
+
+    def search_with_score(
+        self, word: Sequence
+    ) -> Optional[Tuple[Tuple[float, str], Sequence]]:
+        """
+        说明:
+            查找最相似的命令，同时返回排序键，用于合并多个索引的结果
+
+        返回:
+            * `Optional[Tuple[Tuple[float, str], Sequence]]`：(相似度, 命令文本)和命令，
+                没有达到阈值时为`None`
+        """
+        cutoff = self.cutoff
+        length = len(word)
+        postings = self.postings
+        counts = Counter(word)
+        candidates: Set[Sequence] = set()
+        for name_length in self.lengths:
+            # 与real_quick_ratio相同的判断，长度差距过大的桶不会被访问
+            if not _reachable(min(length, name_length), length + name_length, cutoff):
+                continue
+            need = _min_common(length + name_length, cutoff)
+            # 查询词中的字符在该长度桶中的倒排表，从短到长排列，不在桶中的字符不需要访问
+            lists = []
+            skip = 0
+            for char, count in counts.items():
+                posting = postings.get(char, {}).get(name_length)
+                if posting:
+                    lists.append((len(posting), count, posting))
+                else:
+                    skip += count
+            if length - skip < need:
+                continue
+            lists.sort(key=itemgetter(0))
+            # 只有最短的几个倒排表需要遍历，覆盖 length - need + 1 个字符即可
+            covered = skip
+            prefix = 0
+            while prefix < len(lists) and covered <= length - need:
+                covered += lists[prefix][1]
+                prefix += 1
+            common: Dict[Sequence, int] = {}
+            for _, count, posting in lists[:prefix]:
+                for name, name_count in posting.items():
+                    common[name] = common.get(name, 0) + (
+                        count if count < name_count else name_count
+                    )
+            rest = lists[prefix:]
+            rest_count = length - covered
+            for name, num in common.items():
+                # 其余的倒排表只用于补全公共字符数，必然达不到need的命令不再查找
+                if num + rest_count < need:
+                    continue
+                for _, count, posting in rest:
+                    name_count = posting.get(name)
+                    if name_count:
+                        num += count if count < name_count else name_count
+                if num >= need:
+                    candidates.add(name)
+
+        matcher = SequenceMatcher()
+        matcher.set_seq2(word)
+        best = None
+        best_key = None
+        for name in candidates:
+            matcher.set_seq1(name)
+            if (
+                matcher.real_quick_ratio() >= cutoff
+                and matcher.quick_ratio() >= cutoff
+                and (score := matcher.ratio()) >= cutoff
+            ):
+                # 与get_close_matches相同，相似度相同时取较大的命令
+                key = (score, str(name))
+                if best_key is None or key > best_key:
+                    best, best_key = name, key
+        return None if best_key is None else (best_key, best)
+
+
+def _reachable(matches: int, total: int, cutoff: float) -> bool:
+    """与`SequenceMatcher`计算相似度的方式一致，判断`matches`个匹配字符能否达到`cutoff`"""
+    return 2.0 * matches / total >= cutoff if total else True
+
+
+def _min_common(total: int, cutoff: float) -> int:
+    """两条文本总长度为`total`时，相似度达到`cutoff`最少需要的公共字符数"""
+    need = max(0, min(total, int(cutoff * total / 2)))
+    while need and _reachable(need - 1, total, cutoff):
+        need -= 1
+    while need < total and not _reachable(need, total, cutoff):
+        need += 1
+    return need
@@ -0,0 +1,196 @@
+from time import monotonic
+from typing import Dict, List, Optional, Tuple, Union
+
+from nonebot import get_driver
+from nonebot.internal.adapter import Event
+from nonebot.log import logger
+
+from .config import Config, get_config
+
+LogKey = Tuple[str, str]
+"""限流的key：(命令名, 用户id)"""
+
+
+class LogLimiter:
+    """
+    说明:
+        按命令和用户限制日志频率
+
+        * 每个时间窗口内最多输出`burst`条，其余只计数
+        * 窗口结束后，在该key的下一条日志之前或定期检查时输出省略的条数
+
+    参数:
+        * `interval`：时间窗口（秒），为0时不限流
+        * `burst`：每个窗口最多输出的日志数，为0时不限流
+    """
+
+    __slots__ = ("interval", "burst", "windows", "last_sweep")
+
+    interval: float
+    """时间窗口（秒）"""
+    burst: int
+    """每个窗口最多输出的日志数"""
+    windows: Dict[LogKey, List]
+    """key -> [窗口开始时间, 已输出数, 已省略数, 日志等级]"""
+    last_sweep: float
+    """上次检查过期窗口的时间"""
+
+    def __init__(self, interval: float, burst: int) -> None:
+        self.interval = interval
+        self.burst = burst
+        self.windows = {}
+        self.last_sweep = monotonic()
+
+    def log(self, key: LogKey, level: Union[str, int], message: str, *args) -> None:
+        """
+        说明:
+            按限流规则输出日志，`message`使用`str.format`格式，只有真正输出时才会格式化
+
+        参数:
+            * `key`：限流的key
+            * `level`：日志等级
+            * `message`：日志内容
+            * `args`：格式化参数
+        """
+        if self.interval <= 0 or self.burst <= 0:
+            logger.log(level, message, *args)
+            return
+        now = monotonic()
+        if now - self.last_sweep >= self.interval:
+            self.sweep(now)
+        window = self.windows.get(key)
+        if window is None or now - window[0] >= self.interval:
+            if window is not None and window[2]:
+                self.summary(key, window)
+            self.windows[key] = [now, 1, 0, level]
+        elif window[1] < self.burst:
+            window[1] += 1
+        else:
+            window[2] += 1
+            return
+        logger.log(level, message, *args)
+
+    def sweep(self, now: Optional[float] = None) -> None:
+        """输出并清除已经结束的窗口"""
+        if now is None:
+            now = monotonic()
+        self.last_sweep = now
+        expired = [
+            key
+            for key, window in self.windows.items()
+            if now - window[0] >= self.interval
+        ]
+        for key in expired:
+            window = self.windows.pop(key)
+            if window[2]:
+                self.summary(key, window)
+
+    def summary(self, key: LogKey, window: List) -> None:
+        """输出省略的条数"""
+        logger.log(
+            window[3],
+            "命令{}（用户{}）在{}秒内省略了{}条日志",
+            key[0],
+            key[1],
+            self.interval,
+            window[2],
+        )
+
+
+class LogPolicy:
+    """
+    说明:
+        补丁的日志策略，由配置创建
+
+        nb2的日志处理器在过滤器中判断等级，loguru会先格式化消息再丢弃，
+        因此补丁在输出前先用预先计算的开关判断，低于等级的日志不会构造消息
+    """
+
+    __slots__ = (
+        "trace",
+        "debug",
+        "user_error",
+        "user_error_level",
+        "complete",
+        "complete_level",
+        "limiter",
+    )
+
+    trace: bool
+    """是否输出trace日志"""
+    debug: bool
+    """是否输出debug日志"""
+    user_error: bool
+    """是否输出用户参数错误"""
+    user_error_level: str
+    """用户参数错误的日志等级"""
+    complete: bool
+    """是否输出运行完成日志"""
+    complete_level: str
+    """运行完成的日志等级"""
+    limiter: LogLimiter
+    """用户参数错误的限流器"""
+
+    def __init__(self, config: Config, log_level: Union[str, int]) -> None:
+        threshold = get_level_no(config.args_patch_log_level or log_level)
+        self.trace = threshold <= get_level_no("TRACE")
+        self.debug = threshold <= get_level_no("DEBUG")
+        self.user_error_level = config.args_patch_log_user_error_level.upper()
+        self.user_error = threshold <= get_level_no(self.user_error_level)
+        self.complete_level = config.args_patch_log_complete_level.upper()
+        self.complete = threshold <= get_level_no(self.complete_level)
+        self.limiter = LogLimiter(
+            config.args_patch_log_interval, config.args_patch_log_burst
+        )
+
+    def arg_error(self, command: str, event: Event, msg: str) -> None:
+        """
+        说明:
+            按配置的等级和限流规则记录用户参数错误
+
+        参数:
+            * `command`：命令名
+            * `event`：触发的事件
+            * `msg`：错误信息
+        """
+        if not self.user_error:
+            return
+        try:
+            user_id = event.get_user_id()
+        except Exception:
+            user_id = ""
+        self.limiter.log(
+            (command, user_id),
+            self.user_error_level,
+            "命令{}参数错误：{}",
+            command,
+            msg,
+        )
+
+
+def get_level_no(level: Union[str, int]) -> int:
+    """日志等级的数值"""
+    if isinstance(level, int):
+        return level
+    return logger.level(level.upper()).no
+
+
+_policy: Optional[LogPolicy] = None
+
+
+def get_policy() -> LogPolicy:
+    """
+    说明:
+        获取日志策略，nb2初始化之后才会缓存
+
+    返回:
+        * `LogPolicy`：日志策略
+    """
+    global _policy
+    if _policy is None:
+        try:
+            log_level = get_driver().config.log_level
+        except ValueError:
+            return LogPolicy(get_config(), "INFO")
+        _policy = LogPolicy(get_config(), log_level)
+    return _policy
@@ -0,0 +1,233 @@
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
+
+from nonebot import get_driver
+from nonebot.drivers import URL, HTTPServerSetup, Request, Response, ReverseDriver
+
+BUCKETS: Tuple[float, ...] = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+"""延迟直方图的桶上界（秒），最后还有一个`+Inf`桶"""
+PHASES = ("parse", "default", "handler")
+"""统计延迟的阶段：参数解析、默认值获取、handler运行"""
+COUNTERS = (
+    "matches",
+    "arg_errors",
+    "rule_rejected",
+    "help_sent",
+    "help_throttled",
+    "handler_errors",
+)
+"""计数器：匹配成功、参数错误、规则检查未通过、发送帮助、帮助被限流、handler异常"""
+
+
+class Histogram:
+    """固定桶的延迟直方图"""
+
+    __slots__ = ("counts", "sum", "count")
+
+    counts: List[int]
+    """每个桶的数量（非累计），最后一个为`+Inf`"""
+    sum: float
+    """总耗时"""
+    count: int
+    """总次数"""
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """记录一次耗时（秒）"""
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Prometheus格式的累计桶"""
+        result = []
+        total = 0
+        for bound, count in zip(BUCKETS + (float("inf"),), self.counts):
+            total += count
+            result.append(("+Inf" if bound == float("inf") else repr(bound), total))
+        return result
+
+    def to_dict(self) -> Dict[str, Union[int, float, List[Tuple[str, int]]]]:
+        return {"count": self.count, "sum": self.sum, "buckets": self.cumulative()}
+
+
+class CommandMetrics:
+    """
+    说明:
+        单个命令的计数与延迟统计，由`MetricsRegistry.command`创建
+    """
+
+    __slots__ = COUNTERS + ("latency",)
+
+    matches: int
+    """参数匹配成功次数"""
+    arg_errors: int
+    """参数错误次数"""
+    rule_rejected: int
+    """开启`rule_check`时，参数结构不对、没有选中该命令的次数"""
+    help_sent: int
+    """发送帮助信息的次数，包括参数错误和相似命令提示"""
+    help_throttled: int
+    """帮助信息因去重或群上限没有发送的次数"""
+    handler_errors: int
+    """handler抛出异常的次数"""
+    latency: Dict[str, Histogram]
+    """各阶段的延迟直方图"""
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        """清空统计"""
+        self.matches = 0
+        self.arg_errors = 0
+        self.rule_rejected = 0
+        self.help_sent = 0
+        self.help_throttled = 0
+        self.handler_errors = 0
+        self.latency = {phase: Histogram() for phase in PHASES}
+
+    def to_dict(self) -> Dict[str, object]:
+        result: Dict[str, object] = {name: getattr(self, name) for name in COUNTERS}
+        result["latency"] = {
+            phase: histogram.to_dict() for phase, histogram in self.latency.items()
+        }
+        return result
+
+
+class MetricsRegistry:
+    """
+    说明:
+        所有命令的统计，命令matcher的`simple_run`和帮助matcher会自动记录
+
+    例子:
+
+    ```python
+    from nonebot_args_patch.metrics import metrics
+
+    metrics.snapshot()["天气"]["latency"]["default"]["sum"]
+    metrics.write_prometheus("/var/lib/node_exporter/nonebot.prom")
+    ```
+    """
+
+    commands: Dict[str, CommandMetrics]
+    """命令名 -> 统计"""
+
+    def __init__(self) -> None:
+        self.commands = {}
+
+    def command(self, name: str) -> CommandMetrics:
+        """获取命令的统计，不存在时创建"""
+        try:
+            return self.commands[name]
+        except KeyError:
+            metrics = self.commands[name] = CommandMetrics()
+            return metrics
+
+    def reset(self) -> None:
+        """清空所有统计"""
+        for metrics in self.commands.values():
+            metrics.reset()
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        """以字典形式返回所有统计"""
+        return {name: metrics.to_dict() for name, metrics in self.commands.items()}
+
+    def render_prometheus(self, prefix: str = "nonebot_args") -> str:
+        """
+        说明:
+            导出为Prometheus文本格式
+
+        参数:
+            * `prefix`：指标名前缀
+        """
+        lines: List[str] = []
+        items = sorted(self.commands.items())
+        for counter in COUNTERS:
+            name = f"{prefix}_{counter}_total"
+            lines.append(f"# TYPE {name} counter")
+            lines.extend(
+                f'{name}{{command="{_escape(command)}"}} {getattr(metrics, counter)}'
+                for command, metrics in items
+            )
+        name = f"{prefix}_latency_seconds"
+        lines.append(f"# TYPE {name} histogram")
+        for command, metrics in items:
+            label = _escape(command)
+            for phase, histogram in metrics.latency.items():
+                if not histogram.count:
+                    continue
+                labels = f'command="{label}",phase="{phase}"'
+                lines.extend(
+                    f'{name}_bucket{{{labels},le="{bound}"}} {count}'
+                    for bound, count in histogram.cumulative()
+                )
+                lines.append(f"{name}_sum{{{labels}}} {histogram.sum!r}")
+                lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: Union[str, Path]) -> None:
+        """
+        说明:
+            写入Prometheus文本格式文件，可供node_exporter的textfile收集器读取
+
+            先写入临时文件再替换，避免读取到不完整的内容
+        """
+        path = Path(path)
+        temp = path.with_name(f".{path.name}.tmp")
+        temp.write_text(self.render_prometheus(), encoding="utf-8")
+        temp.replace(path)
+
+    def setup_route(self, path: str = "/metrics") -> None:
+        """
+        说明:
+            在nb2的反向驱动器（如FastAPI）上注册Prometheus抓取路由
+
+        异常:
+            * `TypeError`：当前驱动器不支持HTTP服务
+        """
+        driver = get_driver()
+        if not isinstance(driver, ReverseDriver):
+            raise TypeError("当前驱动器不支持HTTP服务，无法注册metrics路由")
+
+        async def _handle(request: Request) -> Response:
+            return Response(
+                200,
+                headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+                content=self.render_prometheus(),
+            )
+
+        driver.setup_http_server(
+            HTTPServerSetup(URL(path), "GET", "nonebot_args_metrics", _handle)
+        )
+
+
+def _escape(value: str) -> str:
+    """转义Prometheus标签值"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics = MetricsRegistry()
+"""全局统计"""
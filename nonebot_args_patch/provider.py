@@ -10,6 +10,7 @@ from typing import (
     MutableMapping,
     Optional,
     Tuple,
+    Type,
     TypeVar,
     Union,
     ValuesView,
@@ -24,6 +25,9 @@ T = TypeVar("T")
 class ArgsProvider(abc.ABC, MutableMapping[int, List[Default]]):
     """默认Args
 
+    存储器只需要实现`MutableMapping`的操作，优先级不存在时不需要自动创建列表。
+    通过`on_command`或`CommandGroup`的`provider_class`为命令选择存储器。
+
     参数:
         args: 当前存储器中已有的Default args
     """
@@ -42,10 +46,16 @@ class DefaultManager(MutableMapping[int, List[Default]]):
     """DefaultArg管理器
 
     实现了常用字典操作，用于管理DefaultArg。
+
+    参数:
+        provider_class: 存储器类，默认为`DefaultManager.provider_class`
     """
 
-    def __init__(self):
-        self.provider: DictProvider = DictProvider({})
+    provider_class: Type[ArgsProvider] = DictProvider
+    """新建管理器时使用的存储器类"""
+
+    def __init__(self, provider_class: Optional[Type[ArgsProvider]] = None):
+        self.provider: ArgsProvider = (provider_class or self.provider_class)({})
 
     def __repr__(self) -> str:
         return f"ArgsManager(provider={self.provider!r})"
@@ -108,6 +118,17 @@ class DefaultManager(MutableMapping[int, List[Default]]):
     def setdefault(self, key: int, default: List[Default]) -> List[Default]:
         return self.provider.setdefault(key, default)
 
+    def set_provider(self, provider_class: Type[ArgsProvider]) -> None:
+        """设置存储器，已有的DefaultArg会被转移到新存储器中
+
+        命令的绑定表在注册时由已有的DefaultArg生成，更换存储器不会改变绑定方式；
+        需要在注册时使用其他存储器时，向`on_command`或`CommandGroup`传入`provider_class`
+
+        参数:
+            provider_class: 存储器类
+        """
+        self.provider = provider_class(self.provider)
+
     def get_arg(self) -> Default:
         """
         获取一个arg，根据priority依次返回
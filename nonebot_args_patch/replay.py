@@ -0,0 +1,495 @@
+"""
+离线回放消息语料，统计命令表的吞吐、延迟、命令分布和参数错误率，不需要连接adapter
+
+用法:
+    nonebot-args-replay corpus.jsonl -p plugins.weather -d src/plugins
+    python -m nonebot_args_patch.replay corpus.jsonl -d src/plugins --json report.json
+
+语料每行一个JSON，`message`为文本或消息段列表，其余字段可选：
+
+    {"message": "天气 北京", "user_id": "10000", "group_id": "20000"}
+    {"message": [{"type": "at", "data": {"qq": "123"}}, {"type": "text", "data": {"text": " 踢出"}}]}
+
+也可以每行只有一个JSON字符串。
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+)
+
+import nonebot
+from nonebot.adapters import Adapter, Bot, Event, Message, MessageSegment
+from nonebot.internal.matcher import Matcher, matchers
+from nonebot.message import handle_event, run_postprocessor
+
+from .args import Default
+from .commandarg import Args, DefaultSlot
+from .consts import ARGS, ARGSTYPE
+from .helper import CommandHelper
+from .result import ArgsResult
+
+PERCENTILES = (50, 90, 99)
+"""报告的延迟分位数"""
+OUTCOMES = ("matched", "arg_error", "help", "unmatched", "error")
+"""每条消息的结果：参数匹配成功、参数错误、相似命令提示、没有命令响应、handler异常"""
+
+
+class ReplayMessageSegment(MessageSegment["ReplayMessage"]):
+    """回放使用的消息段"""
+
+    @classmethod
+    def get_message_class(cls) -> Type["ReplayMessage"]:
+        return ReplayMessage
+
+    def __str__(self) -> str:
+        return self.data["text"] if self.is_text() else f"[{self.type}]"
+
+    def is_text(self) -> bool:
+        return self.type == "text"
+
+
+class ReplayMessage(Message[ReplayMessageSegment]):
+    """回放使用的消息"""
+
+    @classmethod
+    def get_segment_class(cls) -> Type[ReplayMessageSegment]:
+        return ReplayMessageSegment
+
+    @staticmethod
+    def _construct(msg: str) -> Iterable[ReplayMessageSegment]:
+        yield ReplayMessageSegment("text", {"text": msg})
+
+
+class ReplayEvent(Event):
+    """回放使用的消息事件"""
+
+    message: ReplayMessage
+    user_id: str = "10000"
+    group_id: Optional[str] = "20000"
+    to_me: bool = False
+
+    def get_type(self) -> str:
+        return "message"
+
+    def get_event_name(self) -> str:
+        return "message.group" if self.group_id else "message.private"
+
+    def get_event_description(self) -> str:
+        return str(self.message)
+
+    def get_user_id(self) -> str:
+        return self.user_id
+
+    def get_session_id(self) -> str:
+        if self.group_id:
+            return f"group_{self.group_id}_{self.user_id}"
+        return self.user_id
+
+    def get_message(self) -> ReplayMessage:
+        return self.message
+
+    def is_tome(self) -> bool:
+        return self.to_me
+
+
+class ReplayAdapter(Adapter):
+    """回放使用的adapter，不连接任何平台"""
+
+    @classmethod
+    def get_name(cls) -> str:
+        return "replay"
+
+    async def _call_api(self, bot: Bot, api: str, **data: Any) -> Any:
+        return None
+
+
+class ReplayBot(Bot):
+    """回放使用的bot，只记录发送的消息数量"""
+
+    sent: int
+    """发送的消息数"""
+
+    def __init__(self, adapter: Adapter, self_id: str) -> None:
+        super().__init__(adapter, self_id)
+        self.sent = 0
+
+    async def send(self, event: Event, message: Any, **kwargs: Any) -> Any:
+        self.sent += 1
+
+
+class ReplayRecord:
+    """一条消息的回放结果，由运行后处理记录"""
+
+    __slots__ = ("command", "outcome")
+
+    command: Optional[str]
+    """响应的命令名"""
+    outcome: str
+    """结果，见`OUTCOMES`"""
+
+    def __init__(self) -> None:
+        self.command = None
+        self.outcome = "unmatched"
+
+
+class ReplayStats:
+    """
+    说明:
+        回放统计
+
+        * 延迟为每条消息`handle_event`的耗时
+        * 命令分布按响应的命令统计，参数错误也计入该命令
+    """
+
+    latencies: List[float]
+    """每条消息的延迟（秒）"""
+    elapsed: float
+    """回放总耗时（秒）"""
+    outcomes: Counter
+    """结果 -> 消息数"""
+    commands: Dict[str, Counter]
+    """命令名 -> 结果 -> 消息数"""
+    invalid: int
+    """无法解析的语料行数"""
+    sent: int
+    """bot发送的消息数"""
+
+    def __init__(self) -> None:
+        self.latencies = []
+        self.elapsed = 0.0
+        self.outcomes = Counter()
+        self.commands = {}
+        self.invalid = 0
+        self.sent = 0
+
+    def add(self, latency: float, record: ReplayRecord) -> None:
+        """记录一条消息"""
+        self.latencies.append(latency)
+        self.outcomes[record.outcome] += 1
+        if record.command is not None:
+            self.commands.setdefault(record.command, Counter())[record.outcome] += 1
+
+    def percentile(self, percent: float) -> float:
+        """延迟分位数（秒），最近秩法"""
+        latencies = sorted(self.latencies)
+        if not latencies:
+            return 0.0
+        index = min(len(latencies) - 1, int(len(latencies) * percent / 100))
+        return latencies[index]
+
+    def report(self, top: Optional[int] = None) -> Dict[str, Any]:
+        """
+        说明:
+            生成报告
+
+        参数:
+            * `top`：只保留消息数最多的`top`个命令，默认为`None`全部保留
+        """
+        total = len(self.latencies)
+        commands = sorted(
+            self.commands.items(), key=lambda item: sum(item[1].values()), reverse=True
+        )
+        return {
+            "messages": total,
+            "invalid": self.invalid,
+            "sent": self.sent,
+            "elapsed_s": self.elapsed,
+            "throughput_per_s": total / self.elapsed if self.elapsed else 0.0,
+            "latency_us": {
+                **{f"p{p}": self.percentile(p) * 1e6 for p in PERCENTILES},
+                "max": max(self.latencies, default=0.0) * 1e6,
+                "mean": sum(self.latencies) / total * 1e6 if total else 0.0,
+            },
+            "outcomes": {
+                outcome: {
+                    "count": self.outcomes[outcome],
+                    "rate": self.outcomes[outcome] / total if total else 0.0,
+                }
+                for outcome in OUTCOMES
+            },
+            "commands": {
+                name: {
+                    "count": sum(counts.values()),
+                    "arg_errors": counts["arg_error"],
+                    "arg_error_rate": counts["arg_error"] / sum(counts.values()),
+                }
+                for name, counts in commands[:top]
+            },
+        }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """把报告格式化为文本"""
+    latency = report["latency_us"]
+    lines = [
+        f"消息数 {report['messages']}（无法解析 {report['invalid']}），"
+        f"耗时 {report['elapsed_s']:.3f}s，吞吐 {report['throughput_per_s']:.0f} 条/秒",
+        "延迟(us) "
+        + " ".join(f"{name}={value:.1f}" for name, value in latency.items()),
+        "结果 "
+        + " ".join(
+            f"{outcome}={value['count']}({value['rate']:.1%})"
+            for outcome, value in report["outcomes"].items()
+        ),
+        f"{'命令':<20} {'消息数':>8} {'参数错误':>8} {'错误率':>8}",
+    ]
+    lines.extend(
+        f"{name:<20} {value['count']:>8} {value['arg_errors']:>8}"
+        f" {value['arg_error_rate']:>8.1%}"
+        for name, value in report["commands"].items()
+    )
+    return "\n".join(lines)
+
+
+def parse_line(line: str) -> ReplayEvent:
+    """
+    说明:
+        把一行语料转换为事件
+
+    异常:
+        * `ValueError`：不是合法的JSON或缺少`message`
+    """
+    data = json.loads(line)
+    if isinstance(data, str):
+        data = {"message": data}
+    if not isinstance(data, dict) or "message" not in data:
+        raise ValueError("语料缺少message")
+    message = data["message"]
+    if isinstance(message, str):
+        message = ReplayMessage(message)
+    else:
+        message = ReplayMessage(
+            ReplayMessageSegment(segment["type"], segment.get("data", {}))
+            for segment in message
+        )
+    group_id = data.get("group_id", "20000")
+    return ReplayEvent(
+        message=message,
+        user_id=str(data.get("user_id", "10000")),
+        group_id=None if group_id is None else str(group_id),
+        to_me=bool(data.get("to_me", False)),
+    )
+
+
+def load_corpus(lines: Iterable[str], stats: ReplayStats) -> Iterator[ReplayEvent]:
+    """逐行读取语料，跳过空行，无法解析的行计入`stats.invalid`"""
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            yield parse_line(line)
+        except (ValueError, TypeError, KeyError):
+            stats.invalid += 1
+
+
+_record: Optional[ReplayRecord] = None
+"""正在回放的消息的结果"""
+
+
+async def record_matcher(matcher: Matcher, exception: Optional[Exception]) -> None:
+    """运行后处理，记录响应的命令和结果"""
+    from .patch import help_matcher
+
+    record = _record
+    if record is None:
+        return
+    if exception is not None:
+        record.outcome = "error"
+    args = matcher.state.get(ARGSTYPE)
+    if args is not None:
+        record.command = args.help.name
+        if record.outcome != "error":
+            record.outcome = "matched" if ARGS in matcher.state else "arg_error"
+    elif isinstance(matcher, help_matcher) and matcher.block and record.command is None:
+        record.outcome = "help"
+
+
+def get_matcher_classes() -> Set[Type[Matcher]]:
+    """所有已注册的matcher，包括分发模式下的命令matcher"""
+    classes = {matcher for group in matchers.values() for matcher in group}
+    classes.update(CommandHelper.dispatched)
+    return classes
+
+
+def disable_handlers() -> None:
+    """清空除相似命令提示以外所有matcher的handler，回放时不运行插件代码"""
+    from .patch import help_matcher
+
+    for matcher in get_matcher_classes():
+        if matcher is not help_matcher:
+            matcher.handlers = []
+
+
+async def _skip_callable_defaults(
+    cls: Type[Args],
+    result: ArgsResult,
+    default_slots: Tuple[DefaultSlot, ...],
+    bot: Bot,
+    event: Event,
+    matcher: Matcher,
+) -> None:
+    """只填入静态默认值，默认值函数的结果为`None`"""
+    values = result.values
+    for index, default in default_slots:
+        values[index] = None if default.is_callable else default.value
+
+
+def disable_callable_defaults() -> int:
+    """
+    说明:
+        回放时不调用命令的默认值函数（如查询数据库或HTTP接口），结果为`None`
+
+        只替换每个命令自己的`Args`类，共享的`Default`对象不会被修改
+
+    返回:
+        * `int`：有默认值函数的命令数量
+    """
+    count = 0
+    for matcher in get_matcher_classes():
+        args = matcher._default_state.get(ARGSTYPE)
+        if args is None:
+            continue
+        if any(
+            isinstance(arg, Default) and arg.is_callable for _, arg in args.args_list
+        ):
+            args.resolve_defaults = classmethod(_skip_callable_defaults)
+            count += 1
+    return count
+
+
+async def replay(
+    bot: Bot, events: Iterable[Event], stats: Optional[ReplayStats] = None
+) -> ReplayStats:
+    """
+    说明:
+        逐条回放事件，经过nb2的规则、`Args.match`和相似命令提示
+
+    参数:
+        * `bot`：回放使用的bot
+        * `events`：事件
+        * `stats`：记录到已有的统计中，默认新建
+    """
+    global _record
+    stats = stats or ReplayStats()
+    start = time.perf_counter()
+    try:
+        for event in events:
+            _record = record = ReplayRecord()
+            begin = time.perf_counter()
+            await handle_event(bot, event)
+            stats.add(time.perf_counter() - begin, record)
+    finally:
+        _record = None
+    stats.elapsed += time.perf_counter() - start
+    return stats
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="nonebot-args-replay", description="离线回放消息语料，统计命令表的性能"
+    )
+    parser.add_argument("corpus", help="JSONL语料文件，为-时从标准输入读取")
+    parser.add_argument(
+        "-p", "--plugin", action="append", default=[], help="加载插件（模块名）"
+    )
+    parser.add_argument(
+        "-d", "--plugin-dir", action="append", default=[], help="加载目录下的全部插件"
+    )
+    parser.add_argument("--env-file", help="nb2的.env文件，默认使用当前目录的.env")
+    parser.add_argument(
+        "--log-level", default="WARNING", help="nb2的日志等级，默认只输出警告以上"
+    )
+    parser.add_argument("--repeat", type=int, default=1, help="语料回放次数")
+    parser.add_argument(
+        "--run-handlers",
+        action="store_true",
+        help="同时运行插件的handler和默认值函数，默认都不运行",
+    )
+    parser.add_argument("--top", type=int, default=20, help="报告中的命令数量")
+    parser.add_argument("--json", help="同时把报告写入JSON文件")
+    return parser.parse_args(argv)
+
+
+def read_corpus(path: str) -> List[str]:
+    """读取语料的全部行，重复回放时不再读取文件"""
+    if path == "-":
+        return sys.stdin.readlines()
+    return Path(path).read_text(encoding="utf-8").splitlines()
+
+
+def setup(
+    plugins: Sequence[str],
+    plugin_dirs: Sequence[str],
+    env_file: Optional[str] = None,
+    log_level: str = "WARNING",
+) -> Tuple[ReplayBot, int]:
+    """
+    说明:
+        初始化nb2并加载插件
+
+    返回:
+        * `ReplayBot`：回放使用的bot
+        * `int`：加载的插件数量
+    """
+    kwargs: Dict[str, Any] = {"log_level": log_level}
+    if env_file is not None:
+        kwargs["_env_file"] = env_file
+    nonebot.init(**kwargs)
+    from . import patch  # noqa: F401
+
+    loaded = set()
+    for name in plugins:
+        if plugin := nonebot.load_plugin(name):
+            loaded.add(plugin)
+    if plugin_dirs:
+        loaded.update(nonebot.load_plugins(*plugin_dirs))
+    run_postprocessor(record_matcher)
+    return ReplayBot(ReplayAdapter(nonebot.get_driver()), "replay"), len(loaded)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+    lines = read_corpus(args.corpus)
+    bot, num_plugins = setup(
+        args.plugin, args.plugin_dir, args.env_file, args.log_level
+    )
+    if not args.run_handlers:
+        disable_handlers()
+        disable_callable_defaults()
+
+    stats = ReplayStats()
+    events = list(load_corpus(lines, stats))
+
+    async def _run() -> None:
+        for _ in range(max(1, args.repeat)):
+            await replay(bot, events, stats)
+
+    asyncio.run(_run())
+    stats.sent = bot.sent
+    report = stats.report(args.top)
+    report["plugins"] = num_plugins
+    print(format_report(report))
+    if args.json:
+        Path(args.json).write_text(
+            json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from .args import Rest, get_type_name
+from .exception import CommandArgException
+from .tokenizer import iter_spans, unquote
+
+
+class ArgsResult:
+    """
+    说明:
+        单次命令调用的参数匹配结果，每次匹配都会生成新的实例，存放在`state`中
+
+        * 按参数定义顺序存储，可以用位置或参数名获取
+        * 参数名到位置的映射由同一命令的所有结果共享
+        * `convert`的结果会被缓存，多个handler和子依赖获取同一转换结果时只转换一次
+    """
+
+    __slots__ = ("names", "values", "converted")
+
+    names: Dict[str, int]
+    """参数名 -> 位置"""
+    values: List[Any]
+    """参数值，顺序与定义时一致"""
+    converted: Optional[Dict[Tuple[str, Callable[[Any], Any]], Any]]
+    """转换结果缓存"""
+
+    def __init__(self, names: Dict[str, int]) -> None:
+        self.names = names
+        self.values = [None] * len(names)
+        self.converted = None
+
+    def __repr__(self) -> str:
+        items = ", ".join(
+            f"{name}={self.values[index]!r}" for name, index in self.names.items()
+        )
+        return f"ArgsResult({items})"
+
+    def __getitem__(self, key: Union[int, str]) -> Any:
+        if isinstance(key, str):
+            return self.values[self.names[key]]
+        return self.values[key]
+
+    def __setitem__(self, key: Union[int, str], value: Any) -> None:
+        if isinstance(key, str):
+            self.values[self.names[key]] = value
+        else:
+            self.values[key] = value
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.names
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """按参数名获取，不存在时返回default"""
+        index = self.names.get(name)
+        if index is None:
+            return default
+        return self.values[index]
+
+    def convert(self, name: str, func: Callable[[Any], Any]) -> Any:
+        """
+        说明:
+            获取参数经过func转换后的值，同一参数和func只会转换一次
+
+        异常:
+            * `KeyError`：参数不存在
+            * `Exception`：func转换时抛出的异常，不会被缓存
+        """
+        if self.converted is None:
+            self.converted = {}
+        key = (name, func)
+        try:
+            return self.converted[key]
+        except KeyError:
+            pass
+        value = func(self.values[self.names[name]])
+        self.converted[key] = value
+        return value
+
+
+class RestArgs:
+    """
+    说明:
+        `Rest`参数的值，剩余参数文本的惰性视图
+
+        * 只保存原文本和开始位置，每次遍历都从头分词，可以多次遍历
+        * 最多遍历`Rest`的`max`项，超出部分被截断
+
+    例子:
+
+    ```python
+    matcher = on_command("封禁", ids=Rest(type_=int, max=500))
+
+    @matcher.handle()
+    async def _(ids: RestArgs = get_args("ids")):
+        for user_id in ids:
+            ...
+    ```
+    """
+
+    __slots__ = ("text", "pos", "arg", "label")
+
+    text: str
+    """参数文本"""
+    pos: int
+    """剩余参数的开始位置"""
+    arg: Rest
+    """参数定义"""
+    label: str
+    """参数显示名"""
+
+    def __init__(self, text: str, pos: int, arg: Rest, label: str) -> None:
+        self.text = text
+        self.pos = pos
+        self.arg = arg
+        self.label = label
+
+    def __repr__(self) -> str:
+        return f"RestArgs({self.text[self.pos:]!r})"
+
+    def __bool__(self) -> bool:
+        return next(iter_spans(self.text, self.pos), None) is not None
+
+    def spans(self) -> Iterator[Tuple[int, int]]:
+        """逐项返回在参数文本中的位置`(start, end)`"""
+        return islice(iter_spans(self.text, self.pos), self.arg.max)
+
+    def raw(self) -> Iterator[str]:
+        """逐项返回去掉引号和转义的文本，不进行转换"""
+        text = self.text
+        for start, end in self.spans():
+            yield unquote(text[start:end])
+
+    def __iter__(self) -> Iterator[Any]:
+        """
+        说明:
+            逐项返回经过`type_`转换的值
+
+        异常:
+            * `CommandArgException`：转换失败时
+        """
+        type_ = self.arg.type_
+        if type_ is None:
+            yield from self.raw()
+            return
+        for count, value in enumerate(self.raw(), 1):
+            try:
+                yield type_(value)
+            except Exception:
+                msg = f"参数{self.label}的第{count}项应为{get_type_name(type_)}"
+                raise CommandArgException(msg)
+
+    @property
+    def truncated(self) -> bool:
+        """是否有超出`max`被截断的项"""
+        max = self.arg.max
+        if max is None:
+            return False
+        spans = iter_spans(self.text, self.pos)
+        return next(islice(spans, max, None), None) is not None
@@ -1,13 +1,68 @@
 from itertools import product
-from typing import List, Optional, Tuple, Union
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple, Type, Union
 
 from nonebot import get_driver
-from nonebot.consts import CMD_ARG_KEY, CMD_KEY, PREFIX_KEY, RAW_CMD_KEY
+from nonebot.consts import CMD_ARG_KEY, CMD_KEY, CMD_START_KEY, PREFIX_KEY, RAW_CMD_KEY
 from nonebot.internal.adapter import Event
 from nonebot.internal.rule import Rule
 from nonebot.params import Command, T_State
 from nonebot.rule import CMD_RESULT, TRIE_VALUE, CommandRule, TrieRule
 
+if TYPE_CHECKING:
+    from .commandarg import Args
+
+Prefix = Tuple[str, TRIE_VALUE]
+"""命令前缀：(前缀文本, 前缀值)"""
+
+
+class BareCommandIndex:
+    """
+    说明:
+        参数全为`Default`的`space_command`命令不带参数时的文本索引，所有规则共享
+
+        * 包含不带`command_start`的命令本身，以及`command_start`和`command_sep`的全部组合
+        * 同一事件只查找一次，结果被所有规则复用
+    """
+
+    texts: Dict[str, List[TRIE_VALUE]] = {}
+    """消息文本 -> 可能的命令"""
+    _event: Optional[Event] = None
+    """上次查找的事件"""
+    _result: Optional[Tuple[str, List[TRIE_VALUE]]] = None
+    """上次查找的结果"""
+
+    @classmethod
+    def add(cls, prefixes: Iterable[Prefix]) -> None:
+        """添加命令文本"""
+        for text, value in prefixes:
+            values = cls.texts.setdefault(text, [])
+            if value not in values:
+                values.append(value)
+        cls._event = cls._result = None
+
+    @classmethod
+    def lookup(cls, event: Event) -> Optional[Tuple[str, List[TRIE_VALUE]]]:
+        """
+        说明:
+            查找消息文本对应的命令
+
+        返回:
+            * `Optional[Tuple[str, List[TRIE_VALUE]]]`：消息文本和可能的命令，没有时为`None`
+        """
+        if event is cls._event:
+            return cls._result
+        result = None
+        if cls.texts and event.get_type() == "message":
+            try:
+                text = event.get_message().extract_plain_text()
+            except Exception:
+                text = ""
+            values = cls.texts.get(text)
+            if values:
+                result = (text, values)
+        cls._event, cls._result = event, result
+        return result
+
 
 class SpaceCommandRule(CommandRule):
     """带空格的command"""
@@ -26,30 +81,150 @@ class SpaceCommandRule(CommandRule):
             return True
         elif not self.all_default:
             return False
-        if event.get_type() != "message":
+        result = BareCommandIndex.lookup(event)
+        if result is None:
             return False
-        try:
-            msg = event.get_message()
-            text = msg.extract_plain_text()
-        except Exception:
-            return False
-        if not text:
+        text, values = result
+        for value in values:
+            if value.command in self.cmds:
+                prefix = CMD_RESULT(
+                    command=None, raw_command=None, command_arg=None, command_start=None
+                )
+                argmsg = event.get_message().copy()
+                argmsg.clear()
+                prefix[RAW_CMD_KEY] = text
+                prefix[CMD_KEY] = value.command
+                prefix[CMD_START_KEY] = value.command_start
+                prefix[CMD_ARG_KEY] = argmsg.append("")
+                state[PREFIX_KEY] = prefix
+                return True
+        return False
+
+
+class ArgsCheckRule:
+    """
+    说明:
+        在命令规则中检查参数结构，由`check_args`创建
+
+        命令匹配后才检查，结构不对时不会选中该命令，事件继续传播，不会创建matcher实例
+    """
+
+    __slots__ = ("rule", "args")
+
+    rule: CommandRule
+    """原命令规则"""
+    args: Type["Args"]
+    """命令参数类"""
+
+    def __init__(self, rule: CommandRule, args: Type["Args"]) -> None:
+        self.rule = rule
+        self.args = args
+
+    async def __call__(self, event: Event, state: T_State) -> bool:
+        rule = self.rule
+        cmd = state[PREFIX_KEY][CMD_KEY]
+        if isinstance(rule, SpaceCommandRule):
+            if not await rule(event, state, cmd):
+                return False
+        elif cmd not in rule.cmds:
             return False
-        if (text,) in self.cmds:
-            prefix = CMD_RESULT(
-                command=None, raw_command=None, command_arg=None, command_start=None
-            )
-            argmsg = msg.copy()
-            argmsg.clear()
-            prefix[RAW_CMD_KEY] = text
-            prefix[CMD_KEY] = text
-            prefix[CMD_ARG_KEY] = argmsg.append("")
-            state[PREFIX_KEY] = prefix
+        if self.args.check(state[PREFIX_KEY][CMD_ARG_KEY]):
             return True
+        if stats := self.args.metrics:
+            stats.rule_rejected += 1
         return False
 
 
-def space_command(all_default: bool, *cmds: Union[str, Tuple[str, ...]]) -> Rule:
+def check_args(rule: Rule, args: Type["Args"]) -> Rule:
+    """
+    说明:
+        把参数结构检查合并到命令规则中，不增加nb2检查规则的次数
+
+    参数:
+        * `rule`：`command`、`space_command`或`deferred_command`创建的规则
+        * `args`：命令参数类
+    """
+    (checker,) = rule.checkers
+    return Rule(ArgsCheckRule(checker.call, args))
+
+
+def get_prefixes(
+    cmds: Iterable[Union[str, Tuple[str, ...]]], space: str = ""
+) -> Tuple[List[Tuple[str, ...]], List[Prefix]]:
+    """
+    说明:
+        计算命令在`TrieRule`中的全部前缀，与nb2的`command`规则一致
+
+    参数:
+        * `cmds`：命令文本或命令元组
+        * `space`：附加在前缀末尾的文本
+
+    返回:
+        * `List[Tuple[str, ...]]`：命令元组列表
+        * `List[Prefix]`：前缀列表
+    """
+    config = get_driver().config
+    command_start = config.command_start
+    command_sep = config.command_sep
+    commands: List[Tuple[str, ...]] = []
+    prefixes: List[Prefix] = []
+    for command in cmds:
+        if isinstance(command, str):
+            command = (command,)
+
+        commands.append(command)
+
+        if len(command) == 1:
+            for start in command_start:
+                prefixes.append(
+                    (f"{start}{command[0]}{space}", TRIE_VALUE(start, command))
+                )
+        else:
+            for start, sep in product(command_start, command_sep):
+                prefixes.append(
+                    (f"{start}{sep.join(command)}{space}", TRIE_VALUE(start, command))
+                )
+    return commands, prefixes
+
+
+def get_bare_texts(commands: List[Tuple[str, ...]]) -> List[Prefix]:
+    """
+    说明:
+        参数全为`Default`的命令不带参数时可以匹配的消息文本
+
+        * 不带`command_start`的命令本身，如`签到`、`天气.明天`
+        * 带`command_start`的全部组合，与`TrieRule`前缀一致，如`/签到`
+
+    参数:
+        * `commands`：命令元组列表
+    """
+    texts = get_prefixes(commands)[1]
+    config = get_driver().config
+    if "" in config.command_start:
+        return texts
+    for command in commands:
+        if len(command) == 1:
+            texts.append((command[0], TRIE_VALUE("", command)))
+        else:
+            texts.extend(
+                (sep.join(command), TRIE_VALUE("", command))
+                for sep in config.command_sep
+            )
+    return texts
+
+
+def add_prefixes(prefixes: Iterable[Prefix]) -> None:
+    """将前缀加入`TrieRule`"""
+    for prefix, value in prefixes:
+        TrieRule.add_prefix(prefix, value)
+
+
+def space_command(
+    all_default: bool,
+    *cmds: Union[str, Tuple[str, ...]],
+    deferred: Optional[List[Prefix]] = None,
+    deferred_bare: Optional[List[Prefix]] = None,
+) -> Rule:
     """匹配消息命令，命令与参数之间需要空格
 
     根据配置里提供的 {ref}``command_start` <nonebot.config.Config.command_start>`,
@@ -61,6 +236,8 @@ def space_command(all_default: bool, *cmds: Union[str, Tuple[str, ...]]) -> Rule
 
     参数:
         cmds: 命令文本或命令元组
+        deferred: 不为`None`时前缀不立即加入`TrieRule`，而是添加到该列表中
+        deferred_bare: 不为`None`时无参数命令文本不立即加入`BareCommandIndex`，而是添加到该列表中
 
     用法:
         使用默认 `command_start`, `command_sep` 配置
@@ -73,23 +250,27 @@ def space_command(all_default: bool, *cmds: Union[str, Tuple[str, ...]]) -> Rule
     :::
     """
 
-    config = get_driver().config
-    command_start = config.command_start
-    command_sep = config.command_sep
-    commands: List[Tuple[str, ...]] = []
-    for command in cmds:
-        if isinstance(command, str):
-            command = (command,)
-
-        commands.append(command)
-
-        if len(command) == 1:
-            for start in command_start:
-                TrieRule.add_prefix(f"{start}{command[0]} ", TRIE_VALUE(start, command))
+    commands, prefixes = get_prefixes(cmds, " ")
+    if deferred is None:
+        add_prefixes(prefixes)
+    else:
+        deferred.extend(prefixes)
+    if all_default:
+        bare = get_bare_texts(commands)
+        if deferred_bare is None:
+            BareCommandIndex.add(bare)
         else:
-            for start, sep in product(command_start, command_sep):
-                TrieRule.add_prefix(
-                    f"{start}{sep.join(command)} ", TRIE_VALUE(start, command)
-                )
-
+            deferred_bare.extend(bare)
     return Rule(SpaceCommandRule(all_default, commands))
+
+
+def deferred_command(
+    *cmds: Union[str, Tuple[str, ...]], deferred: List[Prefix]
+) -> Rule:
+    """
+    说明:
+        与nb2的`command`规则相同，但前缀添加到`deferred`中，由调用者统一加入`TrieRule`
+    """
+    commands, prefixes = get_prefixes(cmds)
+    deferred.extend(prefixes)
+    return Rule(CommandRule(commands))
@@ -0,0 +1,136 @@
+"""
+命令matcher的运行函数，由`on_command`设置在生成的matcher类上，其他matcher不受影响
+"""
+from contextlib import AsyncExitStack
+from time import perf_counter
+from typing import TYPE_CHECKING, Optional, Type
+
+from nonebot import Bot
+from nonebot.exception import (
+    MatcherException,
+    ProcessException,
+    SkippedException,
+    StopPropagation,
+)
+from nonebot.internal.adapter import Event
+from nonebot.internal.matcher import Matcher, current_handler
+from nonebot.log import logger
+from nonebot.typing import T_DependencyCache, T_State
+
+from .consts import ARGS, ARGSTYPE
+from .exception import CommandArgException
+from .log import get_policy
+from .metrics import CommandMetrics
+from .throttle import get_throttle
+
+if TYPE_CHECKING:
+    from .commandarg import Args
+
+
+async def simple_run(
+    self: Matcher,
+    bot: Bot,
+    event: Event,
+    state: T_State,
+    stack: Optional[AsyncExitStack] = None,
+    dependency_cache: Optional[T_DependencyCache] = None,
+):
+    policy = get_policy()
+    if policy.trace:
+        logger.trace(
+            "{} run with incoming args: bot={}, event={!r}, state={!r}",
+            self,
+            bot,
+            event,
+            state,
+        )
+
+    with self.ensure_context(bot, event):
+        stats: Optional[CommandMetrics] = None
+        handler_start: Optional[float] = None
+        try:
+            # Refresh preprocess state
+            self.state.update(state)
+            if arg_type := self.state.get(ARGSTYPE):
+                arg_type: Type["Args"]
+                stats = arg_type.metrics
+                start = perf_counter()
+                try:
+                    result, default_slots = arg_type.parse(self)
+                    if stats:
+                        parsed = perf_counter()
+                        stats.latency["parse"].observe(parsed - start)
+                    if default_slots:
+                        await arg_type.resolve_defaults(
+                            result, default_slots, bot, event, self
+                        )
+                        if stats:
+                            stats.latency["default"].observe(perf_counter() - parsed)
+                except CommandArgException as e:
+                    await arg_error(self, bot, event, arg_type, e)
+                    return
+                self.state[ARGS] = result
+                if stats:
+                    stats.matches += 1
+                    handler_start = perf_counter()
+            while self.handlers:
+                handler = self.handlers.pop(0)
+                current_handler.set(handler)
+                if policy.debug:
+                    logger.debug("Running handler {}", handler)
+                try:
+                    await handler(
+                        matcher=self,
+                        bot=bot,
+                        event=event,
+                        state=self.state,
+                        stack=stack,
+                        dependency_cache=dependency_cache,
+                    )
+                except SkippedException:
+                    if policy.debug:
+                        logger.debug("Handler {} skipped", handler)
+                except (MatcherException, ProcessException):
+                    raise
+                except CommandArgException as e:
+                    # Rest参数在handler遍历时才转换
+                    if arg_type is None:
+                        raise
+                    await arg_error(self, bot, event, arg_type, e)
+                    return
+                except Exception:
+                    if stats:
+                        stats.handler_errors += 1
+                    raise
+        except StopPropagation:
+            self.block = True
+        finally:
+            if stats and handler_start is not None:
+                stats.latency["handler"].observe(perf_counter() - handler_start)
+            if policy.complete:
+                logger.log(policy.complete_level, "{} running complete", self)
+
+
+async def arg_error(
+    matcher: Matcher,
+    bot: Bot,
+    event: Event,
+    arg_type: Type["Args"],
+    exception: CommandArgException,
+) -> None:
+    """记录参数错误，并发送帮助信息"""
+    stats = arg_type.metrics
+    if stats:
+        stats.arg_errors += 1
+    help = arg_type.help
+    get_policy().arg_error(help.name, event, exception.msg)
+    # 直接使用命令自身的提示，temp命令运行时已被nb2移出matchers，查找相似命令会找不到它
+    matcher.stop_propagation()
+    if not get_throttle().allow(bot, event, help.name):
+        if stats:
+            stats.help_throttled += 1
+        return
+    msg = f"出错，{exception.msg}：\n{help.get_help_msg()}"
+    if stats:
+        stats.help_sent += 1
+    await matcher.send(msg)
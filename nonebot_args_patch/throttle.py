@@ -0,0 +1,120 @@
+from collections import OrderedDict
+from time import monotonic
+from typing import Dict, Hashable, List, Optional
+
+from nonebot.internal.adapter import Bot, Event
+
+from .cache import group_key, user_key
+from .config import get_config
+
+
+class SuggestionThrottle:
+    """
+    说明:
+        限制帮助信息的发送频率，包括参数错误和相似命令提示
+
+        * 同一用户在同一群（会话）内，同一命令的提示在`window`秒内只发送一次
+        * 每个群（会话）每`group_window`秒最多发送`group_limit`条提示
+
+    参数:
+        * `window`：去重时间窗口（秒），为0时不去重
+        * `group_limit`：每个群的提示数上限，为0时不限制
+        * `group_window`：群提示数上限的时间窗口（秒）
+    """
+
+    __slots__ = ("window", "group_limit", "group_window", "recent", "groups")
+
+    window: float
+    """去重时间窗口（秒）"""
+    group_limit: int
+    """每个群的提示数上限"""
+    group_window: float
+    """群提示数上限的时间窗口（秒）"""
+    recent: "OrderedDict[Hashable, float]"
+    """(用户, 群, 命令) -> 去重到期时间，按到期时间排列"""
+    groups: Dict[Hashable, List]
+    """群 -> [窗口开始时间, 已发送数]"""
+
+    def __init__(
+        self, window: float = 30.0, group_limit: int = 10, group_window: float = 60.0
+    ) -> None:
+        self.window = window
+        self.group_limit = group_limit
+        self.group_window = group_window
+        self.recent = OrderedDict()
+        self.groups = {}
+
+    def allow(self, bot: Bot, event: Event, command: str) -> bool:
+        """
+        说明:
+            判断是否发送一条提示，允许发送时同时记录
+
+        参数:
+            * `command`：提示的命令名
+
+        返回:
+            * `bool`：是否发送
+        """
+        now = monotonic()
+        group = group_key(bot, event)
+        key = None
+        if self.window > 0:
+            recent = self.recent
+            # 窗口长度相同，先加入的先到期
+            while recent:
+                first = next(iter(recent))
+                if recent[first] > now:
+                    break
+                del recent[first]
+            try:
+                user = user_key(bot, event)
+            except Exception:
+                user = None
+            key = (user, group, command)
+            if key in recent:
+                return False
+        if self.group_limit > 0:
+            window = self.groups.get(group)
+            if window is None or now - window[0] >= self.group_window:
+                if len(self.groups) > 1024:
+                    self.sweep(now)
+                window = self.groups[group] = [now, 0]
+            if window[1] >= self.group_limit:
+                return False
+            window[1] += 1
+        if key is not None:
+            self.recent[key] = now + self.window
+        return True
+
+    def sweep(self, now: Optional[float] = None) -> None:
+        """清除已经结束的群窗口"""
+        if now is None:
+            now = monotonic()
+        expired = [
+            group
+            for group, window in self.groups.items()
+            if now - window[0] >= self.group_window
+        ]
+        for group in expired:
+            del self.groups[group]
+
+    def clear(self) -> None:
+        """清空记录"""
+        self.recent.clear()
+        self.groups.clear()
+
+
+_throttle: Optional[SuggestionThrottle] = None
+
+
+def get_throttle() -> SuggestionThrottle:
+    """获取按配置创建的提示限流器"""
+    global _throttle
+    if _throttle is None:
+        config = get_config()
+        _throttle = SuggestionThrottle(
+            config.args_patch_help_window,
+            config.args_patch_help_group_limit,
+            config.args_patch_help_group_window,
+        )
+    return _throttle
@@ -0,0 +1,116 @@
+import re
+import shlex
+from itertools import islice
+from typing import Iterator, List, Optional, Tuple
+
+from .config import get_config
+
+TOKEN = re.compile(
+    r"""(?:[^ \t\r\n'"\\]+|'[^']*'|"(?:[^"\\]|\\.)*"|\\.?|['"])+""",
+    re.S,
+)
+"""一个参数：普通字符、单引号、双引号、转义的任意组合"""
+PIECE = re.compile(r"""([^'"\\]+)|'([^']*)'|"((?:[^"\\]|\\.)*)"|\\(.?)|(['"])""", re.S)
+"""参数内的一段"""
+ESCAPE = re.compile(r"\\(.)", re.S)
+"""双引号内的转义"""
+PLAIN = re.compile(r"[^ \t\r\n]+")
+"""不含引号和转义的参数"""
+SPECIAL_CHARS = frozenset("\"'\\")
+"""引号和转义字符"""
+WHITESPACE = " \t\r\n"
+"""分隔参数的空白字符，与shlex一致"""
+
+
+def _unescape(match: "re.Match[str]") -> str:
+    char = match.group(1)
+    return char if char in '"\\' else match.group(0)
+
+
+def unquote(token: str) -> str:
+    """
+    说明:
+        去掉参数的引号和转义，规则与`shlex`的posix模式一致
+
+        * 未闭合的引号按普通字符处理
+        * 结尾的单个`\\`原样保留
+    """
+    if SPECIAL_CHARS.isdisjoint(token):
+        return token
+    parts: List[str] = []
+    for piece in PIECE.finditer(token):
+        kind = piece.lastindex
+        value = piece.group(kind)
+        if kind == 3 and "\\" in value:
+            value = ESCAPE.sub(_unescape, value)
+        elif kind == 4 and not value:
+            # 转义符在结尾时保留自身
+            value = "\\"
+        parts.append(value)
+    return "".join(parts)
+
+
+def iter_spans(text: str, pos: int = 0) -> Iterator[Tuple[int, int]]:
+    """
+    说明:
+        惰性分词，逐个返回参数在原文本中的位置`(start, end)`，
+        用`unquote(text[start:end])`得到参数值
+
+    参数:
+        * `text`：需要分词的文本
+        * `pos`：开始分词的位置
+    """
+    for match in TOKEN.finditer(text, pos):
+        yield match.span()
+
+
+def split(text: str, limit: Optional[int] = None) -> List[str]:
+    """
+    说明:
+        单次扫描的分词，分词规则与`shlex.split`一致，但不会因为未闭合的引号报错
+
+    参数:
+        * `text`：需要分词的文本
+        * `limit`：最多分出的参数数量，达到后不再扫描剩余文本，默认为`None`不限制
+
+    返回:
+        * `List[str]`：分词结果
+    """
+    if limit is None:
+        if SPECIAL_CHARS.isdisjoint(text):
+            return PLAIN.findall(text)
+        return [unquote(token) for token in TOKEN.findall(text)]
+    return [unquote(text[start:end]) for start, end in islice(iter_spans(text), limit)]
+
+
+def shlex_split(text: str, limit: Optional[int] = None) -> List[str]:
+    """
+    说明:
+        使用`shlex`分词，`limit`与`split`一致
+
+    异常:
+        * `ValueError`：引号未闭合时
+    """
+    if limit is None:
+        return shlex.split(text)
+    lex = shlex.shlex(text, posix=True)
+    lex.whitespace_split = True
+    lex.commenters = ""
+    return list(islice(lex, limit))
+
+
+def split_args(text: str, limit: Optional[int] = None) -> List[str]:
+    """
+    说明:
+        根据配置`args_patch_tokenizer`选择分词器进行分词
+
+    参数:
+        * `text`：需要分词的文本
+        * `limit`：最多分出的参数数量，默认为`None`不限制
+
+    异常:
+        * `ValueError`：使用`shlex`且引号未闭合时
+    """
+    if get_config().args_patch_tokenizer == "shlex":
+        return shlex_split(text, limit)
+    return split(text, limit)
@@ -13,6 +13,11 @@ setuptools.setup(
     long_description_content_type="text/markdown",
     url="https://github.com/JustUndertaker/nonebot_args_patch",
     packages=["nonebot_args_patch"],
+    entry_points={
+        "console_scripts": [
+            "nonebot-args-replay = nonebot_args_patch.replay:main",
+        ],
+    },
     classifiers=[
         "Programming Language :: Python :: 3.8",
         "Programming Language :: Python :: 3.9",